@@ -0,0 +1,296 @@
+import os
+import json
+import time
+from src.utils import (load_settings, load_criteria, ensure_directories, config_folder, extract_json_from_text,
+                       DEFAULT_CONFIG)
+from src.sandbox import PDFSandbox
+from src.metadata import extract_metadata
+from src.ai_engine import AIEngine, build_messages, failure_response
+from src.logger import setup_logger
+from src.store import store_path, load_results, save_results, export_results, migrate_legacy_excel
+from src.criteria import active, headers
+from src.screening import prepare_criteria, criteria_ids, migrate_store, clear_flags, apply_response
+from src.decision import active_policy
+from src.providers import build_providers
+from src.batch import (request_line, write_jsonl, read_jsonl, parse_output_line, load_state, save_state,
+                       BatchAPI, run_local, TERMINAL_STATES)
+from src.wire_format import wire_options, decode, check_flags
+
+logger = setup_logger()
+
+def batch_settings(settings):
+    cfg = settings.get("batch") or {}
+    return {
+        "provider": cfg.get("provider", "local"),
+        "dir": cfg.get("dir", "data/batch"),
+        "max_requests_per_file": cfg.get("max_requests_per_file", 5000),
+        "completion_window": cfg.get("completion_window", "24h"),
+        "poll_seconds": cfg.get("poll_seconds", 60),
+        "local_workers": cfg.get("local_workers", 4),
+    }
+
+
+class Context:
+    """Everything the stages share: settings, criteria, store and checkpoint."""
+
+    def __init__(self, config=DEFAULT_CONFIG):
+        self.settings = load_settings(config)
+        ensure_directories(self.settings)
+        self.cfg = batch_settings(self.settings)
+        if not os.path.exists(self.cfg["dir"]):
+            os.makedirs(self.cfg["dir"])
+        self.state_path = os.path.join(self.cfg["dir"], "jobs.json")
+        self.state = load_state(self.state_path)
+
+        inc_list, exc_list = load_criteria(config_folder(config))
+        self.registry, _ = prepare_criteria(self.settings, inc_list, exc_list)
+        self.inc_ids, self.exc_ids = criteria_ids(self.registry)
+        self.store = store_path(self.settings)
+        migrate_legacy_excel(self.settings.get("output_file"), self.store, self.inc_ids, self.exc_ids)
+        if os.path.exists(self.store):
+            migrate_store(self.store, self.registry)
+
+    def save(self):
+        save_state(self.state, self.state_path)
+
+    def processed(self):
+        df = load_results(self.store, columns=['File Name'])
+        return set(df['File Name'].astype(str)) if 'File Name' in df.columns else set()
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        existing = load_results(self.store).to_dict('records') if os.path.exists(self.store) else []
+        save_results(existing + rows, self.store, self.inc_ids, self.exc_ids)
+
+
+def prepare(ctx):
+    """Stage 1: serialize prompts for every PDF not yet screened or queued."""
+    settings, cfg = ctx.settings, ctx.cfg
+    inc_criteria, exc_criteria = active(ctx.registry, "inclusion"), active(ctx.registry, "exclusion")
+    compact, insights_words = wire_options(settings)
+    # Remote batch files go straight to the endpoint, so they need its own model name;
+    # the local stand-in goes through the router, which maps the model itself
+    model = settings.get("model_id")
+    if cfg["provider"] != "local":
+        model = _remote_provider(ctx).model_for(model)
+
+    queued = set()
+    for job in ctx.state["jobs"]:
+        if job["status"] not in ("ingested", "failed"):
+            with open(job["map"], 'r', encoding='utf-8') as f:
+                queued.update(json.load(f).values())
+    processed = ctx.processed()
+
+    sandbox = PDFSandbox(settings)
+    pending = []
+    for root, dirs, files in os.walk(settings.get("input_folder", "data/raw_pdfs")):
+        for file in files:
+            path = os.path.join(root, file)
+            if (file.lower().endswith('.pdf') and file not in processed and path not in queued
+                    and not sandbox.is_quarantined(path)):
+                pending.append(path)
+    logger.info(f"📝 {len(pending)} PDFs to serialize ({len(processed)} screened, {len(queued)} already queued, "
+                f"{len(sandbox.quarantine)} quarantined)")
+
+    unreadable, batches = [], [[]]
+    for filepath, parsed in sandbox.extract_all(pending):
+        if parsed.error:
+            continue
+        meta = extract_metadata(filepath)
+        text = parsed.text
+        if len(text) < 50:
+            meta["Research Paper Title"] = "Unreadable PDF"
+            meta["Included/Excluded"] = 0
+            clear_flags(meta, inc_criteria + exc_criteria)
+            unreadable.append(meta)
+            continue
+        if len(batches[-1]) >= cfg["max_requests_per_file"]:
+            batches.append([])
+        local = parsed.local
+        batches[-1].append((filepath, local, build_messages(meta["File Name"], text,
+                                                            [c["text"] for c in inc_criteria],
+                                                            [c["text"] for c in exc_criteria], known=local,
+                                                            compact=compact, insights_words=insights_words)))
+    sandbox.close()
+    ctx.append_rows(unreadable)
+
+    for entries in batches:
+        if not entries:
+            continue
+        name = f"job_{len(ctx.state['jobs']) + 1:04d}"
+        base = os.path.join(cfg["dir"], name)
+        mapping, resolved = {}, {}
+        lines = []
+        for n, (filepath, local, messages) in enumerate(entries):
+            custom_id = f"{name}-{n:05d}"
+            mapping[custom_id] = filepath
+            resolved[custom_id] = local
+            lines.append(request_line(custom_id, messages, model, settings.get("temperature")))
+        write_jsonl(base + ".requests.jsonl", lines)
+        with open(base + ".map.json", 'w', encoding='utf-8') as f:
+            json.dump(mapping, f)
+        with open(base + ".local.json", 'w', encoding='utf-8') as f:
+            json.dump(resolved, f)
+
+        # Criteria are pinned at prepare time so answers are stamped with the wording asked
+        ctx.state["jobs"].append({
+            "name": name, "status": "prepared", "count": len(lines), "created": time.time(),
+            "requests": base + ".requests.jsonl", "map": base + ".map.json",
+            "output": base + ".output.jsonl", "errors": base + ".errors.jsonl",
+            "backend": cfg["provider"], "batch_id": None,
+            "criteria": {"inclusion": inc_criteria, "exclusion": exc_criteria},
+        })
+        ctx.save()
+        logger.info(f"📦 {name}: {len(lines)} requests -> {base}.requests.jsonl")
+
+
+def _remote_provider(ctx):
+    providers = {p.name: p for p in build_providers(ctx.settings.get("providers"))}
+    provider = providers.get(ctx.cfg["provider"])
+    if not provider:
+        raise ValueError(f"Batch provider '{ctx.cfg['provider']}' is not configured (or has no keys).")
+    return provider
+
+
+def _remote_api(ctx):
+    provider = _remote_provider(ctx)
+    return BatchAPI(provider.base_url, provider.keys[0])
+
+
+def submit(ctx):
+    """Stage 2: hand prepared files to the batch endpoint (or queue them locally)."""
+    for job in ctx.state["jobs"]:
+        if job["status"] != "prepared":
+            continue
+        if job["backend"] == "local":
+            job["status"] = "submitted"
+        else:
+            api = _remote_api(ctx)
+            file_id = api.upload(job["requests"])
+            batch = api.create(file_id, ctx.cfg["completion_window"])
+            job.update(status="submitted", file_id=file_id, batch_id=batch["id"], remote_status=batch.get("status"))
+        job["submitted"] = time.time()
+        ctx.save()
+        logger.info(f"🚀 Submitted {job['name']} ({job['count']} requests) to {job['backend']}")
+
+
+def poll(ctx):
+    """Stage 3: check submitted jobs; download (or locally execute) finished ones."""
+    ai = None
+    for job in ctx.state["jobs"]:
+        if job["status"] != "submitted":
+            continue
+
+        if job["backend"] == "local":
+            ai = ai or AIEngine(ctx.settings)
+            run_local(job["requests"], job["output"], ai, ctx.cfg["local_workers"])
+            job["status"] = "completed"
+            ctx.save()
+            continue
+
+        api = _remote_api(ctx)
+        batch = api.get(job["batch_id"])
+        job["remote_status"] = batch.get("status")
+        counts = batch.get("request_counts") or {}
+        logger.info(f"⏳ {job['name']}: {job['remote_status']} "
+                    f"({counts.get('completed', 0)}/{counts.get('total', job['count'])} done)")
+
+        if job["remote_status"] in TERMINAL_STATES:
+            # Expired/cancelled jobs can still carry partial output; unanswered papers are re-queued later
+            if batch.get("output_file_id"):
+                api.download(batch["output_file_id"], job["output"])
+            if batch.get("error_file_id"):
+                api.download(batch["error_file_id"], job["errors"])
+            job["status"] = "completed" if batch.get("output_file_id") or batch.get("error_file_id") else "failed"
+        ctx.save()
+
+
+def ingest(ctx):
+    """Stage 4: parse outputs with the same JSON handling and strict logic as main.py."""
+    policy = active_policy(ctx.settings)
+    processed = ctx.processed()
+    for job in ctx.state["jobs"]:
+        if job["status"] != "completed":
+            continue
+
+        with open(job["map"], 'r', encoding='utf-8') as f:
+            mapping = json.load(f)
+        resolved = {}
+        local_path = job["map"].replace(".map.json", ".local.json")
+        if os.path.exists(local_path):
+            with open(local_path, 'r', encoding='utf-8') as f:
+                resolved = json.load(f)
+        inc_criteria, exc_criteria = job["criteria"]["inclusion"], job["criteria"]["exclusion"]
+
+        rows = []
+        for record in read_jsonl(job["output"]) + read_jsonl(job["errors"]):
+            custom_id, content, error = parse_output_line(record)
+            filepath = mapping.get(custom_id)
+            if not filepath:
+                continue
+            meta = extract_metadata(filepath)
+            if meta["File Name"] in processed:
+                continue
+
+            response = None
+            if content:
+                try:
+                    response = json.loads(content)
+                except ValueError:
+                    response = extract_json_from_text(content)
+            if response is None:
+                response = failure_response(inc_criteria, exc_criteria, error or "Unparseable JSON")
+            try:
+                response = check_flags(decode(response, len(inc_criteria), len(exc_criteria)))
+            except ValueError as e:
+                response = failure_response(inc_criteria, exc_criteria, str(e))
+
+            apply_response(meta, response, inc_criteria, exc_criteria, policy, resolved.get(custom_id))
+            rows.append(meta)
+            processed.add(meta["File Name"])
+
+        ctx.append_rows(rows)
+        job["status"] = "ingested"
+        job["ingested"] = len(rows)
+        ctx.save()
+        logger.info(f"📥 {job['name']}: ingested {len(rows)}/{job['count']} papers")
+
+    if os.path.exists(ctx.store):
+        output_file = ctx.settings.get("output_file")
+        rows = export_results(ctx.store, output_file, ctx.inc_ids, ctx.exc_ids, headers=headers(ctx.registry))
+        logger.info(f"📤 Exported {rows} rows to {output_file}")
+
+
+def status(ctx):
+    if not ctx.state["jobs"]:
+        print("No batch jobs yet. Run 'python slr.py batch prepare'.")
+    for job in ctx.state["jobs"]:
+        remote = f" [{job['remote_status']}]" if job.get("remote_status") else ""
+        print(f"{job['name']:<10} {job['backend']:<8} {job['count']:>6} requests  {job['status']}{remote}")
+
+
+def main(stage="run", config=DEFAULT_CONFIG):
+    """
+    Overnight batch screening. 'run' chains every stage and polls until all
+    jobs are done; each stage can also be run on its own and resumed.
+    """
+    ctx = Context(config)
+    if stage == "status":
+        return status(ctx)
+    if stage in ("prepare", "run"):
+        prepare(ctx)
+    if stage in ("submit", "run"):
+        submit(ctx)
+    if stage in ("poll", "run"):
+        poll(ctx)
+        while stage == "run" and any(j["status"] == "submitted" for j in ctx.state["jobs"]):
+            time.sleep(ctx.cfg["poll_seconds"])
+            poll(ctx)
+    if stage in ("ingest", "run"):
+        ingest(ctx)
+    logger.info("--- BATCH STAGE COMPLETE ---")
+
+
+if __name__ == "__main__":
+    main()
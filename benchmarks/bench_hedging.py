@@ -0,0 +1,80 @@
+"""
+Tail-latency benchmark for request deadlines and hedged requests.
+
+Screens synthetic papers sequentially (like main.py) against a stub server
+where a share of requests stall, once without and once with hedging, and
+reports p50/p95/p99 per-paper latency, throughput and extra tokens spent.
+
+    python benchmarks/bench_hedging.py --papers 400 --slow-rate 0.05 --slow-latency 3
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import start_stub_server
+from src.ai_engine import AIEngine
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def run(base_url, papers, hedging, keys):
+    settings = {
+        "providers": [{"name": "stub", "type": "openai", "base_url": base_url, "keys": keys}],
+        "request_timeout": 30,
+        "hedging": {"enabled": hedging, "percentile": 0.9, "min_delay": 0.2,
+                    "min_samples": 10, "max_extra_tokens": 0.15},
+    }
+    ai = AIEngine(settings)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(papers):
+        messages = [{"role": "user", "content": f"Paper {i}. OUTPUT FORMAT: " + '{"Inc_1": 0, "Exc_1": 0}'}]
+        t = time.perf_counter()
+        ai.complete(messages, "llama-3.3-70b-versatile", 0.0, label=f"paper-{i}")
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    time.sleep(0.5)  # Let abandoned duplicates report their tokens
+    return latencies, elapsed, ai.hedger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--papers", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.05, help="Normal response time (s)")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="Share of requests that stall")
+    parser.add_argument("--slow-latency", type=float, default=3.0, help="Extra seconds for a stalled request")
+    parser.add_argument("--keys", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(7)
+    _, base_url = start_stub_server(latency=args.latency, jitter=args.jitter,
+                                    slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    keys = [f"key-{i}" for i in range(args.keys)]
+
+    print(f"\n{'Mode':<10} | {'p50 s':>6} | {'p95 s':>6} | {'p99 s':>6} | {'max s':>6} | {'papers/min':>10} | Hedges")
+    print("-" * 78)
+    results = {}
+    for label, hedging in (("baseline", False), ("hedged", True)):
+        latencies, elapsed, hedger = run(base_url, args.papers, hedging, keys)
+        results[label] = percentile(latencies, 0.99)
+        extra = (f"{hedger.hedged} ({hedger.hedge_wins} won, +{hedger.quota.extra_share:.0%} tokens)"
+                 if hedging else "-")
+        print(f"{label:<10} | {percentile(latencies, 0.5):>6.2f} | {percentile(latencies, 0.95):>6.2f} | "
+              f"{percentile(latencies, 0.99):>6.2f} | {max(latencies):>6.2f} | "
+              f"{args.papers / elapsed * 60:>10.0f} | {extra}")
+
+    improved = results["hedged"] < results["baseline"]
+    print(f"\n{'✅' if improved else '❌'} p99 {results['baseline']:.2f}s -> {results['hedged']:.2f}s")
+    return 0 if improved else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
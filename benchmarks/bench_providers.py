@@ -0,0 +1,57 @@
+"""
+Provider routing benchmark against local stub servers.
+
+Starts a "remote" stub that rate-limits every Nth request and a slower local
+overflow stub, then screens synthetic papers through AIEngine. Every request
+must succeed: rate-limited traffic has to spill over to the local backend.
+
+    python benchmarks/bench_providers.py --papers 30
+"""
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import start_stub_server
+from src.ai_engine import AIEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--papers", type=int, default=30)
+    parser.add_argument("--rate-limit-every", type=int, default=3)
+    args = parser.parse_args()
+
+    _, remote_url = start_stub_server(latency=0.02, rate_limit_every=args.rate_limit_every, retry_after=2)
+    _, local_url = start_stub_server(latency=0.10)
+
+    settings = {"providers": [
+        {"name": "remote", "type": "openai", "base_url": remote_url, "weight": 1.0},
+        {"name": "local", "type": "openai", "base_url": local_url, "overflow": True,
+         "models": {"llama-3.3-70b-versatile": "local-llama"}},
+    ]}
+    ai = AIEngine(settings)
+
+    served = Counter()
+    failures = 0
+    start = time.perf_counter()
+    for i in range(args.papers):
+        messages = [{"role": "user", "content": f"Paper {i}. OUTPUT FORMAT: " + '{"Inc_1": 0}'}]
+        try:
+            _, completion = ai.complete(messages, "llama-3.3-70b-versatile", 0.0, label=f"paper-{i}")
+            served[completion.provider] += 1
+        except Exception:
+            failures += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"\nPapers: {args.papers} | Failures: {failures} | {args.papers / elapsed * 60:.0f} papers/min")
+    for name, n in served.items():
+        print(f"   {name:<8} {n:>4} requests")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Slow-consumer check for the PDF sandbox.
+
+main.py, watch.py and deep.py screen each parsed file (API call + pause)
+before asking PDFSandbox.extract_all for the next one. Time spent in the
+consumer must not count against the other workers' parse timeout. This
+script parses small valid PDFs with a consumer slower than the timeout and
+fails (exit code 1) if any of them comes back as an error or quarantined.
+
+    python benchmarks/bench_sandbox.py --files 6 --workers 2 --timeout 1 --consumer 1.5
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sandbox import PDFSandbox
+
+
+def make_pdfs(folder, n):
+    from pypdf import PdfWriter
+    paths = []
+    for i in range(n):
+        writer = PdfWriter()
+        writer.add_blank_page(width=612, height=792)
+        path = os.path.join(folder, f"paper_{i}.pdf")
+        with open(path, 'wb') as f:
+            writer.write(f)
+        paths.append(path)
+    return paths
+
+
+def run(paths, settings, consumer_seconds, rest_chars=None):
+    """Consumes extract_all like a screening loop. Returns (failures, seconds)."""
+    failures = []
+    start = time.perf_counter()
+    with PDFSandbox(settings) as sandbox:
+        for path, parsed in sandbox.extract_all(paths, rest_chars=rest_chars):
+            if parsed.error or sandbox.is_quarantined(path):
+                failures.append(f"{os.path.basename(path)}: {parsed.error}")
+            time.sleep(consumer_seconds)
+    return failures, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=1.0, help="Sandbox parse timeout (s)")
+    parser.add_argument("--consumer", type=float, default=1.5, help="Seconds the consumer spends per file")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as folder:
+        paths = make_pdfs(folder, args.files)
+        settings = {"pdf_sandbox": {"workers": args.workers, "timeout": args.timeout,
+                                    "quarantine_file": os.path.join(folder, "quarantine.json")}}
+        print(f"{'Pass':<12} | {'Files':>5} | {'Failed':>6} | {'Seconds':>7}")
+        print("-" * 42)
+        for name, rest_chars in (("first pages", None), ("later pages", 10000)):
+            failures, seconds = run(paths, settings, args.consumer, rest_chars)
+            failed |= bool(failures)
+            print(f"{name:<12} | {len(paths):>5} | {len(failures):>6} | {seconds:>7.1f}")
+            for failure in failures:
+                print(f"   ❌ {failure}")
+
+    print("-" * 42)
+    print("❌ Valid PDFs failed while the consumer was busy." if failed
+          else "✅ No valid PDF timed out behind a slow consumer.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
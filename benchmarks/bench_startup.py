@@ -0,0 +1,92 @@
+"""
+Startup-time benchmark for the unified CLI (slr.py).
+
+Runs each light-weight command in a fresh interpreter several times and
+fails (exit code 1) if the median wall time exceeds the budget, or if a
+heavy dependency leaks into the import graph of slr.py.
+
+    python benchmarks/bench_startup.py --budget-ms 400
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Commands that must never pay for pandas/pyarrow/numpy/groq/pypdf/tqdm
+FAST_COMMANDS = [
+    ["--help"],
+    ["status"],
+    ["screen", "--help"],
+    ["export", "--help"],
+]
+
+HEAVY_MODULES = ["pandas", "pyarrow", "numpy", "groq", "pypdf", "tqdm", "openpyxl", "dotenv"]
+
+
+def time_command(cmd, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "slr.py"] + cmd, cwd=ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def time_command_python(runs):
+    """Median cost of a bare interpreter start, for reference."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"])
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def leaked_modules():
+    """Runs 'slr status' in a clean interpreter and reports heavy modules it pulled in."""
+    probe = (
+        "import io, sys, contextlib, slr\n"
+        "with contextlib.redirect_stdout(io.StringIO()): slr.main(['status'])\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT,
+                         capture_output=True, text=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=400, help="Median wall-time budget per command")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = time_command_python(args.runs)
+    print(f"Interpreter baseline: {baseline:.0f} ms\n")
+    print(f"{'Command':<24} | {'Median (ms)':>11} | Budget")
+    print("-" * 50)
+
+    failed = False
+    for cmd in FAST_COMMANDS:
+        median = time_command(cmd, args.runs)
+        ok = median <= args.budget_ms
+        failed |= not ok
+        print(f"{' '.join(cmd):<24} | {median:>11.0f} | {'✅' if ok else '❌'}")
+
+    leaks = leaked_modules()
+    print("-" * 50)
+    if leaks:
+        failed = True
+        print(f"❌ Heavy modules imported by slr.py status: {', '.join(leaks)}")
+    else:
+        print("✅ No heavy modules imported by slr.py status.")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Burst check for watch mode.
+
+Starts 'slr watch' in a scratch project against the stub LLM server, then
+drops several PDFs into input_folder at once. Watch mode screens each one
+as the sandbox hands it out, pausing sleep_seconds after every API call, so
+with sleep_seconds above the parse timeout the later files sit finished in
+their workers while earlier ones are screened. Fails (exit code 1) unless
+every PDF gets a result row and none is quarantined.
+
+    python benchmarks/bench_watch.py --files 6 --workers 2 --timeout 1 --sleep 1.5
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import yaml
+from benchmarks.stub_server import start_stub_server
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(path, lines):
+    """Writes a one-page PDF with one Helvetica text line per entry (standard library only)."""
+    stream = "BT /F1 11 Tf 72 720 Td 14 TL " + " ".join(f"({_escape(l)}) '" for l in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for n, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def make_project(folder, base_url, args):
+    settings = yaml.safe_load(open(os.path.join(ROOT, "config", "settings.yaml"), encoding='utf-8'))
+    settings.update({
+        "providers": [{"name": "stub", "type": "openai", "base_url": base_url, "keys": ["stub-key"]}],
+        "sleep_seconds": args.sleep,
+        "input_folder": "data/raw_pdfs",
+        "output_file": "data/results/slr_screened.xlsx",
+        "results_store": "data/results/slr_screened.parquet",
+        "pdf_sandbox": {"workers": args.workers, "timeout": args.timeout,
+                        "quarantine_file": "data/results/quarantine.json"},
+        "watch": {"interval": 0.2, "settle_seconds": 0.3, "rescan_seconds": 300, "export": False},
+    })
+    os.makedirs(os.path.join(folder, "config"))
+    for name in ("inclusion.txt", "exclusion.txt"):
+        shutil.copy(os.path.join(ROOT, "config", name), os.path.join(folder, "config", name))
+    with open(os.path.join(folder, "config", "settings.yaml"), 'w', encoding='utf-8') as f:
+        yaml.safe_dump(settings, f)
+    os.makedirs(os.path.join(folder, "data", "raw_pdfs", "Agriculture", "Scopus"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=1.0, help="Sandbox parse timeout (s)")
+    parser.add_argument("--sleep", type=float, default=1.5, help="sleep_seconds after each API call")
+    args = parser.parse_args()
+
+    _, base_url = start_stub_server()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        make_project(folder, base_url, args)
+        os.chdir(folder)
+        try:
+            import watch
+            from src.store import store_path, count_rows
+            from src.sandbox import quarantine_path, load_quarantine
+
+            # Idle polls before and after the burst; the burst itself takes one or a few cycles
+            cycles = 40 + args.files
+            watcher = threading.Thread(target=watch.main, kwargs={"max_cycles": cycles}, daemon=True)
+            watcher.start()
+            time.sleep(1.0)
+
+            # 1. Drop the whole burst at once (written elsewhere, then moved in)
+            start = time.perf_counter()
+            target = os.path.join("data", "raw_pdfs", "Agriculture", "Scopus")
+            for i in range(args.files):
+                staging = os.path.join(folder, f"staging_{i}.pdf")
+                make_pdf(staging, [f"Paper {i}: Crop yield prediction with machine learning",
+                                   "We evaluate remote sensing features for sugarcane fields.",
+                                   "Results show improved accuracy over regression baselines."])
+                os.replace(staging, os.path.join(target, f"2024_Paper_{i}.pdf"))
+            watcher.join()
+            seconds = time.perf_counter() - start
+
+            # 2. Every file screened, none quarantined
+            settings = yaml.safe_load(open(os.path.join("config", "settings.yaml"), encoding='utf-8'))
+            rows = count_rows(store_path(settings))
+            quarantined = load_quarantine(quarantine_path(settings))
+        finally:
+            os.chdir(cwd)
+
+    print("-" * 50)
+    print(f"Dropped {args.files} PDFs | screened {rows} | quarantined {len(quarantined)} | {seconds:.1f}s")
+    for name, entry in sorted(quarantined.items()):
+        print(f"   🚧 {name}: {entry['reason']}")
+    failed = rows != args.files or bool(quarantined)
+    print("❌ Watch mode lost PDFs from the burst." if failed else "✅ Every PDF in the burst was screened.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
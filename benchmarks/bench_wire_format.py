@@ -0,0 +1,142 @@
+"""
+Response wire-format benchmark: full JSON vs. compact bit strings.
+
+1. Counts completion tokens of a realistic answer in each format (tiktoken if
+   installed, otherwise ~4 chars/token) and checks that decode() gives back
+   exactly the same flags and fields.
+2. Screens synthetic papers through AIEngine against a stub server whose
+   latency grows per completion token (default 4 ms/token, ~250 tokens/s),
+   and reports tokens/paper plus mean and p95 latency per format.
+
+    python benchmarks/bench_wire_format.py --papers 20
+    python benchmarks/bench_wire_format.py --base-url http://127.0.0.1:8080/v1 --model my-model
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import start_stub_server
+from src.ai_engine import AIEngine, build_messages
+from src.utils import load_criteria
+from src.wire_format import encode, decode
+
+INSIGHTS = ("The authors train a convolutional neural network on 2,400 field images of sugarcane leaves "
+            "captured by UAV across three districts, reaching 94% accuracy for red rot and smut detection "
+            "and outperforming SVM and random forest baselines; limited to a single growing season.")
+
+# (label, response_format, insights_words)
+VARIANTS = [
+    ("full", "full", None),
+    ("compact", "compact", None),
+    ("compact, insights<=20", "compact", 20),
+    ("compact, no insights", "compact", 0),
+]
+
+
+def count_tokens(text):
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("cl100k_base").encode(text))
+    except ImportError:
+        return max(len(text) // 4, 1)
+
+
+def realistic_answer(n_inc, n_exc, insights_words=None):
+    """What a model typically writes for one paper, in the full format."""
+    answer = {
+        "Extracted_Title": "Deep Learning Based Detection of Red Rot and Smut in Sugarcane Using UAV Imagery",
+        "Inclusion_Breakdown": {f"Inc_{i+1}": int(i % 3 == 0) for i in range(n_inc)},
+        "Exclusion_Breakdown": {f"Exc_{i+1}": int(i == n_exc - 1) for i in range(n_exc)},
+        "Review_Research_Type": "Research Paper",
+        "Publication_Type": "Journal",
+        "Publisher": "Elsevier",
+        "Venue_Name": "Computers and Electronics in Agriculture",
+        "First_Author_Name": "Priya Deshmukh",
+        "First_Author_Country": "India",
+        "Study_Area_Country": "India",
+        "Insights": INSIGHTS,
+    }
+    if insights_words == 0:
+        answer.pop("Insights")
+    elif insights_words:
+        answer["Insights"] = " ".join(INSIGHTS.split()[:insights_words])
+    return answer
+
+
+def responder(n_inc, n_exc):
+    """Stub answer shaped like the template it was asked for."""
+    def answer(template):
+        compact = "inc" in template
+        insights = template.get("ins" if compact else "Insights")
+        cap = re.search(r'at most (\d+) words', insights or "")
+        words = int(cap.group(1)) if cap else None
+        full = realistic_answer(n_inc, n_exc, 0 if insights is None else words)
+        return encode(full, n_inc, n_exc) if compact else full
+    return answer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--papers", type=int, default=20)
+    parser.add_argument("--token-latency", type=float, default=0.004, help="Stub seconds per completion token")
+    parser.add_argument("--base-url", default=None, help="Benchmark a real OpenAI-compatible endpoint instead")
+    parser.add_argument("--model", default="llama-3.3-70b-versatile")
+    args = parser.parse_args()
+
+    inc_list, exc_list = load_criteria()
+    inc_list = inc_list or [f"Inclusion criterion {i+1}" for i in range(8)]
+    exc_list = exc_list or [f"Exclusion criterion {i+1}" for i in range(6)]
+    n_inc, n_exc = len(inc_list), len(exc_list)
+
+    # 1. Token counts + lossless round trip
+    print(f"Criteria: {n_inc} inclusion, {n_exc} exclusion\n")
+    print(f"{'Format':<24} | {'Tokens':>6} | {'Saved':>6} | Round trip")
+    print("-" * 54)
+    baseline = count_tokens(json.dumps(realistic_answer(n_inc, n_exc)))
+    for label, fmt, words in VARIANTS:
+        full = realistic_answer(n_inc, n_exc, words)
+        wire = encode(full, n_inc, n_exc) if fmt == "compact" else full
+        tokens = count_tokens(json.dumps(wire))
+        ok = decode(json.loads(json.dumps(wire)), n_inc, n_exc) == full
+        print(f"{label:<24} | {tokens:>6} | {1 - tokens / baseline:>6.0%} | {'ok' if ok else 'MISMATCH'}")
+
+    # 2. End-to-end latency through AIEngine
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        _, base_url = start_stub_server(latency=0.05, token_latency=args.token_latency,
+                                        responder=responder(n_inc, n_exc))
+    text = "Abstract. " + INSIGHTS * 4
+
+    print(f"\n{'Format':<24} | {'Out tok':>7} | {'Mean s':>6} | {'p95 s':>6}")
+    print("-" * 54)
+    failures = 0
+    for label, fmt, words in VARIANTS:
+        ai = AIEngine({"providers": [{"name": "bench", "type": "openai", "base_url": base_url, "keys": ["bench"]}],
+                       "response_format": fmt, "insights_words": words})
+        latencies, tokens = [], []
+        for i in range(args.papers):
+            messages = build_messages(f"paper-{i}.pdf", text, inc_list, exc_list,
+                                      compact=ai.compact, insights_words=ai.insights_words)
+            start = time.perf_counter()
+            response, completion = ai.complete(messages, args.model, 0.0, label=f"paper-{i}",
+                                               parse=lambda c: decode(json.loads(c), n_inc, n_exc))
+            latencies.append(time.perf_counter() - start)
+            tokens.append((completion.usage or {}).get("completion_tokens", 0))
+            failures += any(v not in (0, 1) for v in response["Inclusion_Breakdown"].values())
+        p95 = sorted(latencies)[max(int(len(latencies) * 0.95) - 1, 0)]
+        print(f"{label:<24} | {statistics.mean(tokens):>7.0f} | {statistics.mean(latencies):>6.2f} | {p95:>6.2f}")
+
+    if failures:
+        print(f"\n❌ {failures} responses did not decode to valid flags")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Minimal OpenAI-compatible chat server for offline testing.
+
+It answers POST /v1/chat/completions by echoing back the JSON template found
+in the prompt (so every criterion comes back as 0), with configurable latency
+(including a per-completion-token cost, like real decoding), an optional heavy
+tail of stalled requests, and synthetic 429s to exercise key rotation and
+provider failover.
+
+    python benchmarks/stub_server.py --port 8080 --latency 0.2 --rate-limit-every 3
+
+Then point a provider at it in settings.yaml:
+
+    providers:
+      - {name: local, type: openai, base_url: "http://127.0.0.1:8080/v1", overflow: true}
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _template_from_prompt(prompt):
+    """Returns the last {...} block in the prompt, i.e. the OUTPUT FORMAT template."""
+    for match in reversed(list(re.finditer(r'\{.*\}', prompt))):
+        try:
+            return json.loads(match.group(0))
+        except ValueError:
+            continue
+    return {}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    options = {}
+    counter = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass  # Keep benchmark output clean
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send(404, {"error": {"message": "not found"}})
+
+        with StubHandler.lock:
+            type(self).counter += 1  # Per-server count (start_stub_server makes a subclass each)
+            n = type(self).counter
+
+        every = self.options.get("rate_limit_every")
+        if every and n % every == 0:
+            return self._send(429, {"error": {"message": "stub rate limit"}},
+                              {"Retry-After": str(self.options.get("retry_after", 1))})
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+
+        template = _template_from_prompt(prompt)
+        responder = self.options.get("responder")  # Optional callable(template) -> answer dict
+        content = json.dumps(responder(template) if responder else template)
+        delay = (self.options.get("latency", 0) + random.uniform(0, self.options.get("jitter", 0))
+                 + self.options.get("token_latency", 0) * (len(content) // 4))
+        if random.random() < self.options.get("slow_rate", 0):
+            delay += self.options.get("slow_latency", 0)  # Heavy tail: an occasional stalled request
+        time.sleep(delay)
+        self._send(200, {
+            "id": f"stub-{n}",
+            "object": "chat.completion",
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4},
+        })
+
+
+def start_stub_server(port=0, **options):
+    """Starts a stub in a daemon thread. Returns (server, base_url)."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"options": options, "counter": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM server.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds (0..jitter)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Extra seconds per completion token")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of requests that stall")
+    parser.add_argument("--slow-latency", type=float, default=0.0, help="Extra seconds for a stalled request")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.port, latency=args.latency, jitter=args.jitter,
+                                    token_latency=args.token_latency,
+                                    slow_rate=args.slow_rate, slow_latency=args.slow_latency,
+                                    rate_limit_every=args.rate_limit_every, retry_after=args.retry_after)
+    print(f"Stub LLM server listening on {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
-import pandas as pd
+from src.utils import load_settings
+from src.store import store_path, load_results
 
-df = pd.read_excel("slr_screened_complete.xlsx")
+df = load_results(store_path(load_settings()), columns=['Included/Excluded', 'Insights'])
 # Check for any remaining failures
 failed = df[df['Included/Excluded'].astype(str) == '0']
 real_failures = failed[failed['Insights'].astype(str).str.contains("Failed after trying all keys")]
@@ -0,0 +1,80 @@
+import os
+import time
+from src.utils import load_settings, load_criteria, config_folder, DEFAULT_CONFIG
+from src.store import store_path, load_results, save_results, export_results, migrate_legacy_excel
+from src.criteria import headers
+from src.screening import prepare_criteria, criteria_ids, migrate_store
+from src.decision import load_policies, compare
+
+
+def failed_mask(df):
+    """Rows that failed screening keep their 'Error' marker and are not re-decided."""
+    status = df['Included/Excluded'].astype(str).str.contains('Error', case=False)
+    if 'Insights' in df.columns:
+        status |= df['Insights'].astype(str).str.contains("API FAILURE", case=False)
+    return status.to_numpy(dtype=bool)
+
+
+def main(policy_names=None, apply=False, output=None, config=DEFAULT_CONFIG):
+    """
+    Recomputes include/exclude for the whole results store from the stored
+    criteria flags (no API calls) and compares decision policies side by side.
+    The first policy listed is the one written back with `apply`.
+    """
+    print("--- Offline Decision Engine ---")
+
+    settings = load_settings(config)
+    inc_list, exc_list = load_criteria(config_folder(config))
+    registry, _ = prepare_criteria(settings, inc_list, exc_list)
+    inc_ids, exc_ids = criteria_ids(registry)
+
+    store = store_path(settings)
+    migrate_legacy_excel(settings.get("output_file"), store, inc_ids, exc_ids)
+    if not os.path.exists(store):
+        print(f"❌ Results store not found at: {store}")
+        return
+    migrate_store(store, registry)
+
+    available = load_policies(settings)
+    names = policy_names or [settings.get("decision_policy", "strict")] + \
+        [n for n in available if n != settings.get("decision_policy", "strict")]
+    unknown = [n for n in names if n not in available]
+    if unknown:
+        print(f"❌ Unknown policy: {', '.join(unknown)} (defined: {', '.join(available)})")
+        return
+    policies = [available[n] for n in names]
+
+    # Only the flag columns (plus status) are needed for a decision
+    df = load_results(store, columns=['File Name', 'Included/Excluded', 'Insights'] + inc_ids + exc_ids)
+    ok = ~failed_mask(df)
+
+    start = time.perf_counter()
+    decisions, summary = compare(df[ok], policies, inc_ids, exc_ids)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n{'Policy':<20} | {'Included':>8} | {'Share':>6} | {'Agree':>6} | {'Gained':>6} | {'Lost':>5}")
+    print("-" * 66)
+    for name, included, share, agreement, gained, lost in summary:
+        print(f"{name:<20} | {included:>8} | {share:>6.1%} | {agreement:>6.1%} | {gained:>6} | {lost:>5}")
+    print("-" * 66)
+    print(f"⚡ {len(policies)} policies over {int(ok.sum())} papers in {elapsed_ms:.1f} ms "
+          f"({int((~ok).sum())} failed rows skipped). Agreement/Gained/Lost are vs '{names[0]}'.")
+
+    if output:
+        table = df.loc[ok, ['File Name']].copy()
+        for j, name in enumerate(names):
+            table[name] = decisions[:, j]
+        table.to_csv(output, index=False)
+        print(f"💾 Per-paper comparison saved to: {output}")
+
+    if apply:
+        full = load_results(store)
+        full['Included/Excluded'] = full['Included/Excluded'].astype(object)
+        full.loc[ok, 'Included/Excluded'] = decisions[:, 0]
+        save_results(full, store, inc_ids, exc_ids)
+        rows = export_results(store, settings.get("output_file"), inc_ids, exc_ids, headers=headers(registry))
+        print(f"✅ Applied '{names[0]}' to {int(ok.sum())} papers. Exported {rows} rows to {settings.get('output_file')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+from tqdm import tqdm
+from src.utils import load_settings, load_criteria, ensure_directories, config_folder, locate_pdf, DEFAULT_CONFIG
+from src.sandbox import PDFSandbox
+from src.ai_engine import AIEngine
+from src.logger import setup_logger
+from src.store import store_path, load_results, save_results, export_results, migrate_legacy_excel
+from src.criteria import active, headers
+from src.screening import prepare_criteria, criteria_ids, migrate_store
+from src.decision import active_policy
+from src.deep_screen import DeepScreener, is_undecided, DEEP_COL
+
+logger = setup_logger()
+
+
+def main(dry_run=False, config=DEFAULT_CONFIG):
+    """
+    Deep-screens papers already in the results that the first pages left
+    undecided (rejected with no exclusion hit) and were not deep-screened yet.
+    """
+    logger.info("--- Deep Screening of Undecided Papers ---")
+
+    settings = load_settings(config)
+    inc_list, exc_list = load_criteria(config_folder(config))
+    ensure_directories(settings)
+    registry, _ = prepare_criteria(settings, inc_list, exc_list)
+    inc_criteria, exc_criteria = active(registry, "inclusion"), active(registry, "exclusion")
+    inc_ids, exc_ids = criteria_ids(registry)
+    policy = active_policy(settings)
+
+    store = store_path(settings)
+    migrate_legacy_excel(settings.get("output_file"), store, inc_ids, exc_ids)
+    if not os.path.exists(store):
+        logger.error(f"❌ Results store not found at: {store}")
+        return
+    migrate_store(store, registry)
+    rows = load_results(store).to_dict('records')
+
+    # 1. Plan: undecided rows that have not been deep-screened
+    input_folder = settings.get("input_folder", "data/raw_pdfs")
+    plan = {}
+    for index, row in enumerate(rows):
+        done = row.get(DEEP_COL)
+        if is_undecided(row, exc_criteria) and not (isinstance(done, str) and done):
+            path = locate_pdf(row, input_folder)
+            if path:
+                plan[path] = index
+    logger.info(f"📋 {len(plan)} of {len(rows)} papers are undecided after the first pages and not deep-screened yet.")
+    if dry_run or not plan:
+        return
+
+    # 2. Read the later pages in parallel workers, screen chunks concurrently across keys
+    deep = DeepScreener(AIEngine(settings), settings)
+    save_interval = settings.get("save_interval", 5)
+    with PDFSandbox(settings) as sandbox:
+        extracted = sandbox.extract_all(list(plan), rest_chars=deep.max_chars)
+        for n, (path, rest) in tqdm(enumerate(extracted), total=len(plan)):
+            if rest.error:
+                deep.skip(os.path.basename(path), rest.error)
+                continue
+            deep.screen(rows[plan[path]], rest.text, inc_criteria, exc_criteria, policy)
+            if (n + 1) % save_interval == 0:
+                save_results(rows, store, inc_ids, exc_ids)
+    deep.close()
+
+    save_results(rows, store, inc_ids, exc_ids)
+    exported = export_results(store, settings.get("output_file"), inc_ids, exc_ids, headers=headers(registry))
+    logger.info(deep.summary())
+    logger.info(f"📤 Exported {exported} rows to {settings.get('output_file')}")
+    logger.info("--- DEEP SCREENING COMPLETE ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import os
+from tqdm import tqdm
+from src.utils import load_settings, load_criteria, config_folder, find_file_recursive, DEFAULT_CONFIG
+from src.sandbox import PDFSandbox
+from src.metadata import extract_metadata
+from src.ai_engine import AIEngine
+from src.cascade import CascadeScreener
+from src.criteria import active, registry_path, load_registry, sync_registry
+from src.screening import clear_flags, apply_response
+from src.decision import active_policy
+from src.evaluation import (ResponseCache, ReplayEngine, expand_grid, apply_config, config_label,
+                            load_gold, classification, agreement, pareto_front)
+
+METRICS = ("f1", "recall", "precision")
+
+
+def eval_settings(settings):
+    cfg = settings.get("evaluation") or {}
+    return {
+        "gold_file": cfg.get("gold_file", "data/eval/gold.csv"),
+        "cache_file": cfg.get("cache_file", "data/eval/responses.jsonl"),
+        "grid": cfg.get("grid") or {},
+    }
+
+
+def parse_papers(settings, gold, char_limit):
+    """Parses every gold paper once, at the largest pdf_char_limit in the grid."""
+    input_folder = settings.get("input_folder", "data/raw_pdfs")
+    paths = {}
+    for _, row in gold.iterrows():
+        path = row.get("Filepath")
+        if not (isinstance(path, str) and os.path.exists(path)):
+            path = find_file_recursive(input_folder, row["File Name"])
+        if path:
+            paths[path] = row["File Name"]
+
+    parsed = {}
+    with PDFSandbox({**settings, "pdf_char_limit": char_limit, "local_metadata": True}) as sandbox:
+        for path, result in tqdm(sandbox.extract_all(list(paths)), total=len(paths), desc="Parsing"):
+            if not result.error:
+                parsed[paths[path]] = (path, result)
+    return parsed
+
+
+def screen_config(settings, config, gold, papers, cache, live, inc_list, exc_list, registry):
+    """Replays first-pass screening of the gold papers under one configuration."""
+    run = apply_config(settings, config)
+    engine = ReplayEngine(run, cache, live)
+    cascade = (run.get("cascade") or {}).get("enabled")
+    analyzer = CascadeScreener(engine, run) if cascade else engine
+    policy = active_policy(run)
+    inc_criteria, exc_criteria = active(registry, "inclusion"), active(registry, "exclusion")
+    char_limit = run.get("pdf_char_limit", 3500)
+
+    rows = []
+    for name in tqdm(gold["File Name"], desc=config_label(config)[:40], leave=False):
+        if name not in papers:
+            rows.append(None)  # PDF missing or quarantined
+            continue
+        path, parsed = papers[name]
+        meta = extract_metadata(path)
+        text = parsed.text[:char_limit]
+        if len(text) < 50:
+            meta["Included/Excluded"] = 0
+            clear_flags(meta, inc_criteria + exc_criteria)
+            rows.append(meta)
+            continue
+
+        local = parsed.local if run.get("local_metadata", True) else {}
+        response = analyzer.analyze_paper(name, text, inc_list, exc_list, run.get("model_id"),
+                                          run.get("temperature"), known=local)
+        if "API FAILURE" in str(response.get("Insights", "")):
+            rows.append(None)  # Not in the cache (offline) or failed while recording
+            continue
+        apply_response(meta, response, inc_criteria, exc_criteria, policy, local)
+        rows.append(meta)
+    return rows, engine
+
+
+def main(gold_file=None, record=False, metric="f1", output=None, config=DEFAULT_CONFIG):
+    """
+    Replays screening of a gold-labelled set under every configuration in
+    evaluation.grid and reports accuracy next to throughput and token cost.
+    Offline by default (cached responses only); `record` fills the cache.
+    """
+    print("--- Evaluation Against Gold Labels ---")
+
+    settings = load_settings(config)
+    cfg = eval_settings(settings)
+    gold_file = gold_file or cfg["gold_file"]
+    if not os.path.exists(gold_file):
+        print(f"❌ Gold file not found at: {gold_file}")
+        return
+    inc_list, exc_list = load_criteria(config_folder(config))
+    # Synced in memory only: an evaluation run must not bump the saved registry
+    registry = load_registry(registry_path(settings))
+    sync_registry(registry, inc_list, exc_list)
+    try:
+        gold, gold_criteria = load_gold(gold_file, registry)
+        configs = expand_grid(cfg["grid"])
+        for config in configs:
+            active_policy(apply_config(settings, config))  # Bad decision_policy values fail before any parsing
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    # 1. Parse each paper once; shorter char limits are prefixes of the same text
+    char_limit = max([settings.get("pdf_char_limit", 3500)] +
+                     [c["pdf_char_limit"] for c in configs if "pdf_char_limit" in c])
+    papers = parse_papers(settings, gold, char_limit)
+    print(f"📚 {len(gold)} gold papers ({int(gold['Gold'].sum())} included), {len(papers)} PDFs found; "
+          f"{len(configs)} configurations.")
+
+    cache = ResponseCache(cfg["cache_file"])
+    live = AIEngine(settings) if record else None
+    print(f"🗄️ {len(cache.entries)} cached responses in {cfg['cache_file']}"
+          + (" (recording misses)" if record else " (offline replay)"))
+
+    # 2. Replay every configuration
+    results = []
+    for config in configs:
+        rows, engine = screen_config(settings, config, gold, papers, cache, live, inc_list, exc_list, registry)
+        scored = [(g, row["Included/Excluded"]) for g, row in zip(gold["Gold"], rows) if row is not None]
+        screened = len(scored)
+        result = {"config": config_label(config),
+                  **classification([g for g, _ in scored], [p for _, p in scored])}
+        per_criterion = agreement(gold, rows, gold_criteria)
+        result.update({
+            "criteria_agreement": sum(per_criterion.values()) / len(per_criterion) if per_criterion else None,
+            "papers_per_min": 60 * screened / engine.seconds if engine.seconds else 0.0,
+            "tokens_per_paper": engine.tokens / screened if screened else 0.0,
+            "screened": screened,
+            "missing": len(rows) - screened,
+            "recorded": engine.recorded,
+            **{f"agree_{cid}": value for cid, value in per_criterion.items()},
+        })
+        results.append(result)
+
+    # 3. Report, best first; ★ = Pareto-optimal among configurations that screened every paper
+    complete = [i for i, r in enumerate(results) if r["screened"] and not r["missing"]]
+    front = {complete[i] for i in pareto_front([results[i] for i in complete], metric)}
+    order = sorted(range(len(results)), key=lambda i: (-results[i][metric], -results[i]["papers_per_min"]))
+    width = max(len(r["config"]) for r in results + [{"config": "Configuration"}])
+    print(f"\n{'':<2}{'Configuration':<{width}} | {'Prec':>5} | {'Recall':>6} | {'F1':>5} | {'Crit':>5} | "
+          f"{'Papers/min':>10} | {'Tok/paper':>9} | Missing")
+    print("-" * (width + 68))
+    for i in order:
+        r = results[i]
+        crit = f"{r['criteria_agreement']:>5.0%}" if r["criteria_agreement"] is not None else f"{'-':>5}"
+        print(f"{'★' if i in front else ' ':<2}{r['config']:<{width}} | {r['precision']:>5.0%} | "
+              f"{r['recall']:>6.0%} | {r['f1']:>5.0%} | {crit} | {r['papers_per_min']:>10.1f} | "
+              f"{r['tokens_per_paper']:>9.0f} | {r['missing']}")
+    print("-" * (width + 68))
+    print(f"★ Pareto-optimal on {metric}, papers/min (API time only, no sleep_seconds) and tokens/paper, "
+          f"among configurations with no missing papers. Crit = mean per-criterion agreement with the gold flags.")
+
+    missing = sum(r["missing"] for r in results)
+    if missing and not record:
+        print(f"⚠️ {missing} paper/configuration pairs had no cached response. Run with --record to fill the cache.")
+    if output:
+        import pandas as pd
+        table = pd.DataFrame(results)
+        table["pareto"] = [i in front for i in range(len(results))]
+        table.to_csv(output, index=False)
+        print(f"💾 Per-configuration metrics (incl. per-criterion agreement) saved to: {output}")
+
+    if not front:
+        print("❌ No configuration has responses for every paper.")
+        return
+    best = max(front, key=lambda i: (results[i][metric], results[i]["papers_per_min"]))
+    r = results[best]
+    print(f"🏁 Best {metric} on the front: {r['config']} ({metric} {r[metric]:.1%}, FP rate {r['fp_rate']:.1%}, "
+          f"FN rate {r['fn_rate']:.1%}, {r['papers_per_min']:.1f} papers/min)")
+    per_criterion = {k[len("agree_"):]: v for k, v in r.items() if k.startswith("agree_")}
+    if per_criterion:
+        print("   Per-criterion agreement: " + ", ".join(f"{cid} {v:.0%}" for cid, v in per_criterion.items()))
+
+
+if __name__ == "__main__":
+    main()
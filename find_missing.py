@@ -1,18 +1,23 @@
 import os
-import pandas as pd
+from src.utils import load_settings, DEFAULT_CONFIG
+from src.store import store_path, load_results, read_columns
 
 def normalize_name(name):
     """Cleans filename for accurate comparison."""
     return str(name).strip()
 
-def main():
+def main(config=DEFAULT_CONFIG):
     print("🚀 Starting Deep Scan of all subfolders...\n")
     
     # 1. Define Paths
     # We start from the current directory and look for 'data'
     base_dir = os.getcwd()
     raw_pdf_dir = os.path.join(base_dir, "data", "raw_pdfs")
-    excel_path = os.path.join(base_dir, "data", "results", "slr_screened.xlsx")
+    try:
+        store = store_path(load_settings(config))
+    except FileNotFoundError:
+        store = store_path({})
+    store = os.path.join(base_dir, store)
 
     # 2. Recursively find ALL PDFs in the directory tree
     all_pdf_files = set()
@@ -29,22 +34,22 @@ def main():
                 
     print(f"   Found {len(all_pdf_files)} PDFs in total.")
 
-    # 3. Load Processed List from Excel
-    print(f"\n📊 Reading Excel: {excel_path}")
-    if not os.path.exists(excel_path):
-        print("❌ Error: Excel file not found.")
+    # 3. Load Processed List from the results store (one column only)
+    print(f"\n📊 Reading results: {store}")
+    if not os.path.exists(store):
+        print("❌ Error: Results store not found.")
         return
 
     try:
-        df = pd.read_excel(excel_path)
         # Use the 'File Name' column. If it doesn't exist, try 'Research Paper Title' as fallback
-        col_name = 'File Name' if 'File Name' in df.columns else 'Research Paper Title'
-        
+        col_name = 'File Name' if 'File Name' in read_columns(store) else 'Research Paper Title'
+        df = load_results(store, columns=[col_name])
+
         processed_files = set(df[col_name].apply(normalize_name))
-        print(f"   Found {len(processed_files)} rows in Excel.")
+        print(f"   Found {len(processed_files)} rows in results.")
         
     except Exception as e:
-        print(f"❌ Error reading Excel: {e}")
+        print(f"❌ Error reading results: {e}")
         return
 
     # 4. Compare
@@ -52,7 +57,7 @@ def main():
     
     print("\n" + "="*40)
     print(f"📄 Total PDFs on Disk:    {len(all_pdf_files)}")
-    print(f"✅ Processed in Excel:    {len(processed_files)}")
+    print(f"✅ Processed in results:  {len(processed_files)}")
     print(f"⚠️  Not Processed Yet:     {len(missing_files)}")
     print("="*40)
 
@@ -1,11 +1,17 @@
 import os
 import time
-import pandas as pd
 from tqdm import tqdm
-from src.utils import load_settings, load_criteria, ensure_directories
-from src.pdf_utils import extract_text_from_pdf
+from src.utils import load_settings, load_criteria, ensure_directories, config_folder, DEFAULT_CONFIG
+from src.store import store_path, load_results, save_results, export_results, migrate_legacy_excel
+from src.sandbox import PDFSandbox
 from src.metadata import extract_metadata
 from src.ai_engine import AIEngine
+from src.cascade import CascadeScreener
+from src.criteria import active, headers, describe_diff, registry_path
+from src.screening import prepare_criteria, criteria_ids, migrate_store, clear_flags, apply_response
+from src.decision import active_policy
+from src.scheduler import Scheduler
+from src.deep_screen import DeepScreener, is_undecided
 from src.logger import setup_logger
 
 # Initialize Logger
@@ -13,137 +19,243 @@ logger = setup_logger()
 
 # --- SETTINGS ---
 TEST_LIMIT = None  # None = Run Everything
+MIN_TEXT = 50      # Fewer extracted characters = unreadable PDF (no API call)
 
-def main():
-    logger.info("--- Auto-SLR-Screener Started (Professional Logging Mode) ---")
-    
-    try:
-        settings = load_settings()
-        inc_list, exc_list = load_criteria() 
-        ensure_directories(settings)
-        ai = AIEngine()
-    except Exception as e:
-        logger.critical(f"Startup Failed: {e}")
-        return
 
-    input_folder = settings.get("input_folder", "data/raw_pdfs")
-    logger.info(f"Scanning folder: {input_folder}")
-    
+def find_pdfs(input_folder):
     pdf_files = []
     for root, dirs, files in os.walk(input_folder):
         for file in files:
             if file.lower().endswith('.pdf'):
                 pdf_files.append(os.path.join(root, file))
-    
-    if TEST_LIMIT:
-        pdf_files = pdf_files[:TEST_LIMIT]
-        logger.warning(f"⚠️ TEST MODE ACTIVE: Processing subset of {len(pdf_files)} files.")
-    else:
-        logger.info(f"Found {len(pdf_files)} PDFs to process.")
+    return pdf_files
 
-    output_file = settings.get("output_file")
-    results = []
-    processed_files = set()
 
-    if os.path.exists(output_file):
-        try:
-            existing = pd.read_excel(output_file)
-            results = existing.to_dict('records')
-            if 'File Name' in existing.columns:
-                processed_files = set(existing['File Name'].astype(str))
-            logger.info(f"Resuming... {len(processed_files)} papers already completed.")
-        except:
-            logger.warning("Output file exists but unreadable. Starting fresh.")
+def format_eta(seconds):
+    if seconds <= 0:
+        return "done"
+    if seconds < 60:
+        return f"~{seconds:.0f} s left"
+    if seconds < 3600:
+        return f"~{seconds / 60:.0f} min left"
+    return f"~{seconds / 3600:.1f} h left"
 
-    # Main Loop
-    for i, filepath in tqdm(enumerate(pdf_files), total=len(pdf_files)):
+
+class Session:
+    """
+    Everything a screening run sets up once (settings, criteria, AI engine,
+    PDF sandbox, results in memory), shared by main() and watch mode.
+    """
+
+    def __init__(self, config=DEFAULT_CONFIG):
+        self.settings = settings = load_settings(config)
+        self.inc_list, self.exc_list = load_criteria(config_folder(config))
+        ensure_directories(settings)
+        self.store = store_path(settings)
+        # On a fresh project every criterion is "added": nothing to warn about yet
+        tracked = os.path.exists(registry_path(settings)) or os.path.exists(self.store)
+        self.registry, diff = prepare_criteria(settings, self.inc_list, self.exc_list)
+        self.policy = active_policy(settings)
+        self.ai = AIEngine(settings)
+
+        # Criteria are tracked by stable ID; answers are stored under the ID
+        self.inc_criteria = active(self.registry, "inclusion")
+        self.exc_criteria = active(self.registry, "exclusion")
+        self.inc_ids, self.exc_ids = criteria_ids(self.registry)
+        if tracked and (diff["added"] or diff["changed"] or diff["removed"]):
+            logger.warning("⚠️ Criteria changed since the last run:\n" + describe_diff(diff))
+            logger.warning("   Existing papers keep their old answers. Run 'python slr.py rescreen' to update them.")
+
+        # Cascade: small model first, large model only for uncertain papers
+        self.cascade = None
+        if (settings.get("cascade") or {}).get("enabled"):
+            self.cascade = CascadeScreener(self.ai, settings)
+            logger.info(f"🪜 Cascade mode: {self.cascade.screen_model} -> {settings.get('model_id')}")
+        self.analyzer = self.cascade or self.ai
+        self.started = time.time()
+
+        # Deep screen: later pages of papers the first pages left undecided
+        self.deep = DeepScreener(self.ai, settings)
+        if self.deep.enabled:
+            logger.info(f"🔬 Deep screen on: {self.deep.chunk_tokens}-token chunks, {self.deep.workers} at a time")
+
+        # PDFs are parsed in time/memory-limited worker processes; bad files are quarantined
+        self.sandbox = PDFSandbox(settings)
+        self.output_file = settings.get("output_file")
+        self.results = []
+        self.rows = {}  # File Name -> index in results
+
+    def load_results(self):
+        """Loads the results store once; later saves write from memory."""
+        output_file, store = self.output_file, self.store
+        if migrate_legacy_excel(output_file, store, self.inc_ids, self.exc_ids):
+            logger.info(f"Imported existing {output_file} into results store: {store}")
+        if os.path.exists(store) and migrate_store(store, self.registry):
+            logger.info("Renamed criterion-text columns in the results store to criterion IDs.")
+
+        if os.path.exists(store):
+            try:
+                self.results = load_results(store).to_dict('records')
+                self.rows = {str(r.get('File Name')): i for i, r in enumerate(self.results)
+                             if r.get('File Name') is not None}
+                logger.info(f"Resuming... {len(self.rows)} papers already completed.")
+            except Exception:
+                logger.warning("Results store exists but unreadable. Starting fresh.")
+
+    def is_done(self, filepath):
+        return os.path.basename(filepath) in self.rows
+
+    def add(self, meta):
+        """Appends a row, or replaces the row of a re-screened file."""
+        name = meta["File Name"]
+        if name in self.rows:
+            self.results[self.rows[name]] = meta
+        else:
+            self.rows[name] = len(self.results)
+            self.results.append(meta)
+
+    def screen(self, filepath, parsed):
+        """Screens one parsed PDF into a result row. Returns the row (None if quarantined)."""
+        if parsed.error:
+            return None  # Quarantined (timeout/memory/crash): never blocks the batch
+        settings = self.settings
         meta = extract_metadata(filepath)
-        
-        if meta["File Name"] in processed_files:
-            continue
+        text = parsed.text
 
-        text = extract_text_from_pdf(filepath, settings.get("pdf_char_limit", 3500))
-        
-        if len(text) < 50:
+        if len(text) < MIN_TEXT:
             logger.warning(f"Skipping Empty PDF: {meta['File Name']}")
             meta["Research Paper Title"] = "Unreadable PDF"
             meta["Included/Excluded"] = 0
-            for c in inc_list + exc_list: meta[c] = 0
-            results.append(meta)
-            continue
+            clear_flags(meta, self.inc_criteria + self.exc_criteria)
+            self.add(meta)
+            return meta
 
-        # AI Call
-        response = ai.analyze_paper(
-            meta["File Name"], text, inc_list, exc_list,
-            settings.get("model_id"), settings.get("temperature")
+        # AI Call (only for the metadata fields the PDF itself could not resolve)
+        local = parsed.local
+        response = self.analyzer.analyze_paper(
+            meta["File Name"], text, self.inc_list, self.exc_list,
+            settings.get("model_id"), settings.get("temperature"), known=local
         )
 
         if response:
-            extracted_title = response.get("Extracted_Title", "").strip()
-            meta["Research Paper Title"] = extracted_title if len(extracted_title) > 5 else meta["File Name"]
-
-            # 1. Extract Flags
-            inc_score = 0
-            inc_data = response.get("Inclusion_Breakdown", {})
-            for idx, c in enumerate(inc_list): 
-                val = 1 if inc_data.get(f"Inc_{idx+1}", 0) == 1 else 0
-                meta[c] = val
-                inc_score += val
-
-            exc_score = 0
-            exc_data = response.get("Exclusion_Breakdown", {})
-            for idx, c in enumerate(exc_list): 
-                val = 1 if exc_data.get(f"Exc_{idx+1}", 0) == 1 else 0
-                meta[c] = val
-                exc_score += val
-
-            # 2. Strict Logic Decision
-            if exc_score > 0:
-                meta["Included/Excluded"] = 0
+            # 1. Flags, 2. Strict Logic Decision (rule engine), 3. Metadata
+            inc_score, exc_score = apply_response(meta, response, self.inc_criteria, self.exc_criteria,
+                                                  self.policy, local)
+            if self.deep.enabled and is_undecided(meta, self.exc_criteria):
+                rest = self.sandbox.extract(filepath, rest_chars=self.deep.max_chars)
+                if rest.error:
+                    self.deep.skip(meta["File Name"], rest.error)
+                else:
+                    self.deep.screen(meta, rest.text, self.inc_criteria, self.exc_criteria, self.policy)
+            if meta["Included/Excluded"] == 1:
+                logger.info(f"➕ INCLUDED: {meta['File Name']}")
+            elif exc_score > 0:
                 logger.debug(f"➖ Excluded (Criteria Hit): {meta['File Name']}")
-            elif inc_score == 0:
-                meta["Included/Excluded"] = 0
-                logger.debug(f"➖ Excluded (No Match): {meta['File Name']}")
             else:
-                meta["Included/Excluded"] = 1
-                logger.info(f"➕ INCLUDED: {meta['File Name']}")
+                logger.debug(f"➖ Excluded (No Match): {meta['File Name']}")
 
-            # 3. Metadata
-            meta["Review/Research Paper"] = response.get("Review_Research_Type", "Research Paper")
-            meta["Publication"] = response.get("Publisher", "")
-            meta["Journal/Conference Paper"] = response.get("Publication_Type", "Unknown")
-            meta["Scopus/SCI/SCIE/specific conference paper"] = response.get("Venue_Name", "") 
-            meta["First Author Name"] = response.get("First_Author_Name", "")
-            meta["First Author’s Country Name"] = response.get("First_Author_Country", "Unknown")
-            meta["Study Area Country Name"] = response.get("Study_Area_Country", "Unknown")
-            meta["Insights"] = response.get("Insights", "")
-            
         else:
             meta["Included/Excluded"] = "Error"
             logger.error(f"Analysis Failed: {meta['File Name']}")
 
-        results.append(meta)
+        self.add(meta)
+        return meta
+
+    def pause(self):
+        """Rate-limit pause after an API call."""
+        time.sleep(self.cascade.pause() if self.cascade else self.settings.get("sleep_seconds", 20))
+
+    def save(self):
+        save_results(self.results, self.store, self.inc_ids, self.exc_ids)
 
-        if (i + 1) % 5 == 0:
-            save_excel(results, output_file, inc_list, exc_list)
-            logger.info(f"💾 Saved Progress ({i+1}/{len(pdf_files)})")
+    def export(self):
+        rows = export_results(self.store, self.output_file, self.inc_ids, self.exc_ids,
+                              headers=headers(self.registry))
+        logger.info(f"📤 Exported {rows} rows to {self.output_file}")
+
+    def close(self):
+        self.sandbox.close()
+        self.deep.close()
+        if self.deep.papers or self.deep.unreadable:
+            logger.info(self.deep.summary())
+        if self.cascade:
+            logger.info(self.cascade.summary(elapsed=time.time() - self.started))
+        if self.ai.hedger.enabled:
+            logger.info(self.ai.hedger.summary())
+
+
+def main(config=DEFAULT_CONFIG):
+    logger.info("--- Auto-SLR-Screener Started (Professional Logging Mode) ---")
+    
+    try:
+        session = Session(config)
+    except Exception as e:
+        logger.critical(f"Startup Failed: {e}")
+        return
+
+    input_folder = session.settings.get("input_folder", "data/raw_pdfs")
+    logger.info(f"Scanning folder: {input_folder}")
+    pdf_files = find_pdfs(input_folder)
+    
+    if TEST_LIMIT:
+        pdf_files = pdf_files[:TEST_LIMIT]
+        logger.warning(f"⚠️ TEST MODE ACTIVE: Processing subset of {len(pdf_files)} files.")
+    else:
+        logger.info(f"Found {len(pdf_files)} PDFs to process.")
+
+    sandbox = session.sandbox
+    quarantined = sum(1 for f in pdf_files if sandbox.is_quarantined(f))
+    if quarantined:
+        logger.warning(f"🚧 Skipping {quarantined} quarantined PDFs (see {sandbox.quarantine_file}; "
+                       f"'python slr.py quarantine --clear' to retry them).")
+
+    save_interval = session.settings.get("save_interval", 5)
+    session.load_results()
+
+    # Priority scheduling: probable inclusions first (PDFs are parsed up front, in parallel)
+    scheduler = None
+    if (session.settings.get("scheduler") or {}).get("enabled"):
+        pending = [f for f in pdf_files if not session.is_done(f) and not sandbox.is_quarantined(f)]
+        scheduler = Scheduler(session.settings, session.inc_list, session.results)
+        for filepath, parsed in tqdm(sandbox.extract_all(pending), total=len(pending), desc="Scoring"):
+            scheduler.add(filepath, parsed)
+        scheduler.build()
+        logger.info(f"🧭 Prioritized {len(scheduler)} pending PDFs; ~{scheduler.likely} likely inclusions "
+                    f"expected first ({format_eta(scheduler.eta())}).")
+        queue = iter(scheduler)
+    else:
+        queue = ((f, None) for f in pdf_files)
+    included = 0
+
+    # Main Loop
+    progress = tqdm(queue, total=len(scheduler) if scheduler is not None else len(pdf_files))
+    for i, (filepath, parsed) in enumerate(progress):
+        if session.is_done(filepath) or sandbox.is_quarantined(filepath):
+            continue
+
+        started = time.time()
+        parsed = parsed or sandbox.extract(filepath)
+        meta = session.screen(filepath, parsed)
+        if meta is None or len(parsed.text) < MIN_TEXT:
+            continue
+        included += meta["Included/Excluded"] == 1
+
+        if (i + 1) % save_interval == 0:
+            session.save()
+            logger.info(f"💾 Saved Progress ({i+1}/{progress.total})"
+                        + (f" | {included} included, likely inclusions: {format_eta(scheduler.eta())}"
+                           if scheduler is not None else ""))
         
-        time.sleep(settings.get("sleep_seconds", 20))
+        session.pause()
+        if scheduler is not None:
+            scheduler.record(time.time() - started)
+            progress.set_postfix_str(f"{included} included | likely inclusions: {format_eta(scheduler.eta())}")
 
-    save_excel(results, output_file, inc_list, exc_list)
+    session.close()
+    if session.results:
+        session.save()
+        session.export()
     logger.info("--- BATCH COMPLETE ---")
 
-def save_excel(results, output_file, inc_list, exc_list):
-    df = pd.DataFrame(results)
-    base_cols = ['Category', 'Database', 'Year', 'Research Paper Title', 'Included/Excluded']
-    criteria_cols = inc_list + exc_list
-    meta_cols = [
-        'Review/Research Paper', 'Publication', 'Journal/Conference Paper',
-        'Scopus/SCI/SCIE/specific conference paper', 'First Author Name',
-        'First Author’s Country Name', 'Study Area Country Name', 'Insights', 'File Name'
-    ]
-    final_order = [c for c in base_cols + criteria_cols + meta_cols if c in df.columns]
-    df[final_order].to_excel(output_file, index=False)
-
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -6,28 +6,37 @@ from tqdm import tqdm
 from pypdf import PdfWriter, PdfReader
 
 # Import custom modules
-from src.utils import load_settings, load_criteria, ensure_directories
-from src.pdf_utils import extract_text_from_pdf
+from src.utils import load_settings, load_criteria, ensure_directories, config_folder, DEFAULT_CONFIG
+from src.sandbox import PDFSandbox
 from src.metadata import extract_metadata
 from src.ai_engine import AIEngine
+from src.store import column_order
+from src.criteria import active, headers
+from src.screening import prepare_criteria, criteria_ids, clear_flags, apply_response
+from src.decision import active_policy
 
 # --- CONFIGURATION ---
 SAMPLE_SIZE = 20  # Number of random files to test
 VERIFICATION_PDF_NAME = "Verification_Random_20.pdf"
 
-def main():
+def main(config=DEFAULT_CONFIG):
     print(f"--- Auto-SLR-Screener (Random Sample Mode: {SAMPLE_SIZE} Files) ---")
     
     # 1. Setup
     try:
-        settings = load_settings()
-        inc_list, exc_list = load_criteria() 
+        settings = load_settings(config)
+        inc_list, exc_list = load_criteria(config_folder(config))
         ensure_directories(settings)
-        ai = AIEngine()
+        registry, _ = prepare_criteria(settings, inc_list, exc_list)
+        policy = active_policy(settings)
+        ai = AIEngine(settings)
     except Exception as e:
         print(f"Startup Failed: {e}")
         return
 
+    inc_criteria, exc_criteria = active(registry, "inclusion"), active(registry, "exclusion")
+    inc_ids, exc_ids = criteria_ids(registry)
+
     # 2. Gather All Files
     input_folder = settings.get("input_folder", "data/raw_pdfs")
     print(f"Scanning: {input_folder}")
@@ -49,7 +58,16 @@ def main():
         target_files = all_pdf_files
         print(f"⚠️ Less than {SAMPLE_SIZE} files found. Processing all {total_found}.")
 
-    # 4. Generate Verification PDF First
+    # 4. Parse the sample in time/memory-limited workers (bad files are quarantined, not fatal)
+    with PDFSandbox(settings) as sandbox:
+        parsed_files = dict(sandbox.extract_all(target_files))
+    for filepath in target_files:
+        parsed = parsed_files.get(filepath)
+        if parsed is None or parsed.error:
+            print(f"Skipping quarantined PDF: {os.path.basename(filepath)}")
+    target_files = [f for f in target_files if f in parsed_files and not parsed_files[f].error]
+
+    # 5. Generate Verification PDF First
     print(f"\nGenering {VERIFICATION_PDF_NAME} for visual check...")
     pdf_writer = PdfWriter()
     valid_files = [] # Only process files we can actually read
@@ -69,66 +87,34 @@ def main():
         pdf_writer.write(f)
     print(f"✅ Created {VERIFICATION_PDF_NAME}. Row N in Excel = Page N in this PDF.\n")
 
-    # 5. Process the Valid Files through AI
+    # 6. Process the Valid Files through AI
     output_file = settings.get("output_file")
     results = []
 
     print("Starting AI Analysis on Sample...")
     for i, filepath in tqdm(enumerate(valid_files), total=len(valid_files)):
         meta = extract_metadata(filepath)
-        text = extract_text_from_pdf(filepath, settings.get("pdf_char_limit", 3500))
+        text = parsed_files[filepath].text
         
         # Handle unreadable text (even if PDF opened, text layer might be missing)
         if len(text) < 50:
             meta["Research Paper Title"] = "Unreadable Text Layer"
             meta["Included/Excluded"] = 0
-            for c in inc_list + exc_list: meta[c] = 0
+            clear_flags(meta, inc_criteria + exc_criteria)
             results.append(meta)
             continue
 
         # AI Call
+        local = parsed_files[filepath].local
         response = ai.analyze_paper(
             meta["File Name"], text, inc_list, exc_list,
-            settings.get("model_id"), settings.get("temperature")
+            settings.get("model_id"), settings.get("temperature"), known=local
         )
 
         if response:
-            extracted_title = response.get("Extracted_Title", "").strip()
-            meta["Research Paper Title"] = extracted_title if len(extracted_title) > 5 else meta["File Name"]
-
-            # --- EXTRACT FLAGS ---
-            inc_score = 0
-            inc_data = response.get("Inclusion_Breakdown", {})
-            for idx, c in enumerate(inc_list): 
-                val = inc_data.get(f"Inc_{idx+1}", 0)
-                meta[c] = val
-                inc_score += val
-
-            exc_score = 0
-            exc_data = response.get("Exclusion_Breakdown", {})
-            for idx, c in enumerate(exc_list): 
-                val = exc_data.get(f"Exc_{idx+1}", 0)
-                meta[c] = val
-                exc_score += val
-
-            # --- STRICT LOGIC CALCULATION ---
+            # --- FLAGS, STRICT LOGIC CALCULATION, METADATA ---
             # Exclude if ANY exclusion criteria is met OR NO inclusion criteria are met
-            if exc_score > 0:
-                meta["Included/Excluded"] = 0
-            elif inc_score == 0:
-                meta["Included/Excluded"] = 0
-            else:
-                meta["Included/Excluded"] = 1
-
-            # --- METADATA ---
-            meta["Review/Research Paper"] = response.get("Review_Research_Type", "Research Paper")
-            meta["Publication"] = response.get("Publisher", "")
-            meta["Journal/Conference Paper"] = response.get("Publication_Type", "Unknown")
-            meta["Scopus/SCI/SCIE/specific conference paper"] = response.get("Venue_Name", "") 
-            meta["First Author Name"] = response.get("First_Author_Name", "")
-            meta["First Author’s Country Name"] = response.get("First_Author_Country", "Unknown")
-            meta["Study Area Country Name"] = response.get("Study_Area_Country", "Unknown")
-            meta["Insights"] = response.get("Insights", "")
+            apply_response(meta, response, inc_criteria, exc_criteria, policy, local)
             
         else:
             meta["Included/Excluded"] = "Error"
@@ -139,20 +125,12 @@ def main():
         # Sleep to respect rate limits
         time.sleep(settings.get("sleep_seconds", 20))
 
-    # 6. Save Final Excel
+    # 7. Save Final Excel
     df = pd.DataFrame(results)
     
     # Dynamic Column Ordering
-    base_cols = ['Category', 'Database', 'Year', 'Research Paper Title', 'Included/Excluded']
-    criteria_cols = inc_list + exc_list
-    meta_cols = [
-        'Review/Research Paper', 'Publication', 'Journal/Conference Paper',
-        'Scopus/SCI/SCIE/specific conference paper', 'First Author Name',
-        'First Author’s Country Name', 'Study Area Country Name', 'Insights', 'File Name'
-    ]
-    
-    final_order = [c for c in base_cols + criteria_cols + meta_cols if c in df.columns]
-    df[final_order].to_excel(output_file, index=False)
+    final_order = column_order(list(df.columns), inc_ids, exc_ids, keep_extra=False)
+    df[final_order].rename(columns=headers(registry)).to_excel(output_file, index=False)
     
     print("-" * 60)
     print("RANDOM SAMPLE TEST COMPLETE")
@@ -0,0 +1,125 @@
+import os
+import time
+from tqdm import tqdm
+from src.utils import load_settings, load_criteria, ensure_directories, config_folder, locate_pdf, DEFAULT_CONFIG
+from src.sandbox import PDFSandbox
+from src.ai_engine import AIEngine
+from src.logger import setup_logger
+from src.store import store_path, load_results, save_results, export_results, migrate_legacy_excel
+from src.criteria import HASHES_COL, active, headers, describe_diff, read_hashes, stale_criteria
+from src.screening import prepare_criteria, criteria_ids, migrate_store, apply_flags, clear_flags
+from src.decision import active_policy, decide
+
+logger = setup_logger()
+
+
+def is_failed(row):
+    return ("error" in str(row.get("Included/Excluded", "")).lower() or
+            "API FAILURE" in str(row.get("Insights", "")))
+
+
+def as_decision(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def main(dry_run=False, config=DEFAULT_CONFIG):
+    """
+    Incremental re-screening after a criteria edit: only added or reworded
+    criteria are asked again, unchanged answers are kept, and every decision
+    is recomputed from the stored answers.
+    """
+    logger.info("--- Incremental Re-Screening ---")
+
+    settings = load_settings(config)
+    inc_list, exc_list = load_criteria(config_folder(config))
+    ensure_directories(settings)
+    registry, diff = prepare_criteria(settings, inc_list, exc_list)
+    logger.info("Criteria changes in this sync:\n" + describe_diff(diff))
+
+    inc_criteria, exc_criteria = active(registry, "inclusion"), active(registry, "exclusion")
+    inc_ids, exc_ids = criteria_ids(registry)
+
+    store = store_path(settings)
+    migrate_legacy_excel(settings.get("output_file"), store, inc_ids, exc_ids)
+    if not os.path.exists(store):
+        logger.error(f"❌ Results store not found at: {store}")
+        return
+    migrate_store(store, registry)
+    df = load_results(store)
+    df['Included/Excluded'] = df['Included/Excluded'].astype(object)
+
+    # 1. Plan: which criteria each paper still needs an answer for
+    plan = []
+    for index, row in df.iterrows():
+        if is_failed(row):
+            continue  # retry_errors.py owns failed rows
+        stale = stale_criteria(read_hashes(row.get(HASHES_COL)), inc_criteria + exc_criteria)
+        if stale:
+            plan.append((index, [c for c in stale if c["kind"] == "inclusion"],
+                         [c for c in stale if c["kind"] == "exclusion"]))
+
+    asked = sum(len(i) + len(e) for _, i, e in plan)
+    total = len(inc_criteria) + len(exc_criteria)
+    logger.info(f"📋 {len(plan)} of {len(df)} papers need re-screening "
+                f"({asked} criterion answers instead of {len(plan) * total} for a full re-run).")
+    if dry_run:
+        return
+
+    # 2. Ask only the stale criteria
+    ai = AIEngine(settings) if plan else None
+    sandbox = PDFSandbox(settings)
+    input_folder = settings.get("input_folder", "data/raw_pdfs")
+    save_interval = settings.get("save_interval", 5)
+
+    for n, (index, stale_inc, stale_exc) in tqdm(enumerate(plan), total=len(plan)):
+        row = df.loc[index]
+        filename = row["File Name"]
+        flags = {HASHES_COL: row.get(HASHES_COL)}
+
+        pdf_path = locate_pdf(row, input_folder)
+        parsed = sandbox.extract(pdf_path) if pdf_path else None
+        if parsed is not None and parsed.error:
+            logger.error(f"PDF quarantined, keeping previous answers: {filename}")
+            continue
+        text = parsed.text if parsed else ""
+
+        if str(row.get("Research Paper Title")) == "Unreadable PDF" or len(text) < 50:
+            clear_flags(flags, stale_inc + stale_exc)
+        else:
+            response = ai.analyze_paper(
+                filename, text,
+                [c["text"] for c in stale_inc], [c["text"] for c in stale_exc],
+                settings.get("model_id"), settings.get("temperature"), metadata=False
+            )
+            if "API FAILURE" in str(response.get("Insights", "")):
+                logger.error(f"Re-screen failed, keeping previous answers: {filename}")
+                continue
+            apply_flags(flags, response, stale_inc, stale_exc)
+            time.sleep(settings.get("sleep_seconds", 20))
+
+        for col, val in flags.items():
+            df.loc[index, col] = val
+
+        if (n + 1) % save_interval == 0:
+            save_results(df, store, inc_ids, exc_ids)
+
+    sandbox.close()
+
+    # 3. Recompute every decision from the stored answers (no API calls)
+    ok = ~df.apply(is_failed, axis=1).to_numpy(dtype=bool)
+    decisions = decide(df, active_policy(settings), inc_ids, exc_ids)
+    previous = df['Included/Excluded'].map(as_decision).to_numpy()
+    changed = int((previous[ok] != decisions[ok]).sum())
+    df.loc[ok, 'Included/Excluded'] = decisions[ok]
+
+    save_results(df, store, inc_ids, exc_ids)
+    rows = export_results(store, settings.get("output_file"), inc_ids, exc_ids, headers=headers(registry))
+    logger.info(f"🔁 {changed} decisions changed. Exported {rows} rows to {settings.get('output_file')}")
+    logger.info("--- RE-SCREENING COMPLETE ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,15 @@
-import pandas as pd
 import os
 import time
-import json
-import re
-from groq import RateLimitError
-from src.utils import load_settings, load_criteria
-from src.pdf_utils import extract_text_from_pdf
-from src.ai_engine import AIEngine
-
-def find_file_recursive(root_dir, target_filename):
-    """Recursively searches for a file in a directory tree."""
-    for dirpath, _, filenames in os.walk(root_dir):
-        if target_filename in filenames:
-            return os.path.join(dirpath, target_filename)
-    return None
+from src.utils import (load_settings, load_criteria, config_folder, find_file_recursive, extract_json_from_text,
+                       DEFAULT_CONFIG)
+from src.sandbox import PDFSandbox
+from src.ai_engine import AIEngine, AIRequestError
+from src.store import store_path, load_results, save_results, export_results, migrate_legacy_excel
+from src.criteria import HASHES_COL, active, headers
+from src.screening import prepare_criteria, criteria_ids, migrate_store, apply_flags
+from src.decision import active_policy, decide_row
 
-def extract_json_from_text(text):
-    """Surgical tool to find JSON inside a messy AI response."""
-    try:
-        match = re.search(r'(\{.*\})', text, re.DOTALL)
-        if match:
-            return json.loads(match.group(1))
-    except Exception:
-        pass
-    return None
+COMPLETE_FILE = "slr_screened_complete.xlsx"
 
 def robust_analyze(ai, filename, text, inc_list, exc_list, model):
     """
@@ -51,69 +37,68 @@ def robust_analyze(ai, filename, text, inc_list, exc_list, model):
     }}
     """
 
-    # --- KEY ROTATION LOOP ---
-    max_retries = len(ai.keys) + 2
-    
-    for attempt in range(max_retries):
+    # --- PROVIDER ROTATION LOOP ---
+    # The engine re-routes on rate limits; we add retries for unparseable replies
+    for attempt in range(3):
         try:
-            completion = ai.client.chat.completions.create(
-                model=model,
-                messages=[
+            raw_content, _ = ai.complete(
+                [
                     {"role": "system", "content": "You are a JSON extractor."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1
+                model, temperature=0.1, json_mode=False, label=filename
             )
-            
-            # If successful, extract JSON
-            raw_content = completion.choices[0].message.content
-            clean_json = extract_json_from_text(raw_content)
-            
-            if clean_json:
-                return clean_json
-            else:
-                print(f"   ⚠️  Attempt {attempt+1}: AI replied, but JSON parsing failed.")
-        
-        except RateLimitError:
-            print(f"   ⚠️  Rate Limit hit on Key #{ai.current_key_index + 1}. Rotating...")
-            ai.switch_key()
-            time.sleep(1)
-            continue
-            
-        except Exception as e:
+        except AIRequestError as e:
             print(f"   ⚠️  Error: {e}")
-            time.sleep(1)
+            return None
+
+        # If successful, extract JSON
+        clean_json = extract_json_from_text(raw_content)
+        if clean_json:
+            return clean_json
+        print(f"   ⚠️  Attempt {attempt+1}: AI replied, but JSON parsing failed.")
+        time.sleep(1)
 
     return None
 
-def main():
+def main(config=DEFAULT_CONFIG):
     print("--- Retry Failed Papers Script (Rotation + Surgical Mode) ---")
     
-    input_excel = "data/results/slr_screened.xlsx"
-    if not os.path.exists(input_excel):
-        print(f"❌ Excel file not found at: {input_excel}")
+    settings = load_settings(config)
+    inc_list, exc_list = load_criteria(config_folder(config))
+    registry, _ = prepare_criteria(settings, inc_list, exc_list)
+    inc_criteria, exc_criteria = active(registry, "inclusion"), active(registry, "exclusion")
+    inc_ids, exc_ids = criteria_ids(registry)
+    policy = active_policy(settings)
+    store = store_path(settings)
+    migrate_legacy_excel(settings.get("output_file"), store, inc_ids, exc_ids)
+    if os.path.exists(store):
+        migrate_store(store, registry)
+
+    if not os.path.exists(store):
+        print(f"❌ Results store not found at: {store}")
         return
 
-    df = pd.read_excel(input_excel)
-    
-    # Standardize columns
-    df['Included/Excluded'] = df['Included/Excluded'].astype(str)
-    df['Insights'] = df['Insights'].astype(str)
-
-    error_rows = df[
-        (df['Included/Excluded'].str.contains('Error', case=False)) | 
-        (df['Insights'].str.contains("API FAILURE", case=False))
-    ]
-    
-    if error_rows.empty:
+    # Only the two status columns are needed to find failures
+    status = load_results(store, columns=['Included/Excluded', 'Insights'])
+    failed = (
+        status['Included/Excluded'].astype(str).str.contains('Error', case=False) |
+        status['Insights'].astype(str).str.contains("API FAILURE", case=False)
+    )
+
+    if not failed.any():
         print("✅ No errors found! Your file is clean.")
         return
 
-    print(f"Found {len(error_rows)} failed papers. Retrying with full key rotation...")
-    
-    settings = load_settings()
-    inc_list, exc_list = load_criteria()
-    ai = AIEngine()
+    print(f"Found {int(failed.sum())} failed papers. Retrying with full key rotation...")
+
+    # Full rows are loaded only when there is something to fix
+    df = load_results(store)
+    df['Included/Excluded'] = df['Included/Excluded'].astype(object)
+    df['Insights'] = df['Insights'].astype(object)
+    error_rows = df[failed.values]
+    ai = AIEngine(settings)
+    sandbox = PDFSandbox(dict(settings, pdf_char_limit=3000, local_metadata=False))
     
     for index, row in error_rows.iterrows():
         filename = row['File Name']
@@ -124,7 +109,11 @@ def main():
             print("   ❌ File lost.")
             continue
 
-        text = extract_text_from_pdf(pdf_path, 3000)
+        parsed = sandbox.extract(pdf_path)
+        if parsed.error:
+            print(f"   🚧 Quarantined: {parsed.error}")
+            continue
+        text = parsed.text
         
         # Call the new robust function
         data = robust_analyze(ai, filename, text, inc_list, exc_list, settings["model_id"])
@@ -135,34 +124,23 @@ def main():
             df.at[index, "Insights"] = data.get("Insights", "Recovered")
             df.at[index, "Review/Research Paper"] = data.get("Review_Research_Type", "Research Paper")
             
-            inc_data = data.get("Inclusion_Breakdown", {})
-            exc_data = data.get("Exclusion_Breakdown", {})
-            
-            # Update criteria columns
-            for i, crit in enumerate(inc_list):
-                if crit in df.columns:
-                    df.at[index, crit] = inc_data.get(f"Inc_{i+1}", 0)
-            for i, crit in enumerate(exc_list):
-                if crit in df.columns:
-                    df.at[index, crit] = exc_data.get(f"Exc_{i+1}", 0)
-
-            # Strict Logic Decision
-            exc_score = sum(1 for v in exc_data.values() if v == 1)
-            inc_score = sum(1 for v in inc_data.values() if v == 1)
-            
-            if exc_score > 0:
-                df.at[index, "Included/Excluded"] = 0
-            elif inc_score == 0:
-                df.at[index, "Included/Excluded"] = 0
-            else:
-                df.at[index, "Included/Excluded"] = 1
+            # Update criteria columns (by criterion ID, stamped with the current wording)
+            flags = {HASHES_COL: row.get(HASHES_COL)}
+            apply_flags(flags, data, inc_criteria, exc_criteria)
+            for col, val in flags.items():
+                df.loc[index, col] = val
+
+            # Strict Logic Decision (same rule engine as main.py)
+            df.at[index, "Included/Excluded"] = decide_row(flags, policy, inc_ids, exc_ids)
         else:
             print("   ❌ Failed after trying all keys.")
 
-        # Save constantly
-        df.to_excel("slr_screened_complete.xlsx", index=False)
+        # Save constantly (cheap: columnar store, not Excel)
+        save_results(df, store, inc_ids, exc_ids)
 
-    print(f"\n✨ DONE. Final dataset saved to: slr_screened_complete.xlsx")
+    sandbox.close()
+    export_results(store, COMPLETE_FILE, inc_ids, exc_ids, headers=headers(registry))
+    print(f"\n✨ DONE. Final dataset saved to: {COMPLETE_FILE}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,300 @@
+"""
+Unified command-line entry point for Auto-SLR-Screener.
+
+    python slr.py status
+    python slr.py screen
+    python slr.py missing
+    python slr.py batch run
+
+Only the standard library and PyYAML are imported at module load. pandas,
+groq, pyarrow, pypdf and tqdm are imported inside the subcommand that needs them, so
+status and audit commands start almost instantly (see benchmarks/bench_startup.py).
+"""
+import os
+import re
+import sys
+import time
+import zipfile
+import argparse
+
+DEFAULT_SETTINGS = "config/settings.yaml"
+
+
+def _settings(args):
+    """Loads settings.yaml, falling back to defaults if it is missing."""
+    from src.utils import load_settings
+    try:
+        return load_settings(args.config)
+    except FileNotFoundError:
+        return {}
+
+
+def _scan_pdfs(input_folder):
+    """Counts PDFs per Category/Database without opening any of them."""
+    counts = {}
+    total = 0
+    for root, dirs, files in os.walk(input_folder):
+        n = sum(1 for f in files if f.lower().endswith('.pdf'))
+        if n:
+            rel = os.path.relpath(root, input_folder)
+            counts[rel] = counts.get(rel, 0) + n
+            total += n
+    return total, counts
+
+
+def _xlsx_row_count(path):
+    """Reads the sheet dimension tag straight from the zip, avoiding openpyxl."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            with zf.open("xl/worksheets/sheet1.xml") as f:
+                head = f.read(4096).decode("utf-8", errors="ignore")
+        match = re.search(r'<dimension ref="[A-Z]+\d+:[A-Z]+(\d+)"', head)
+        if match:
+            return max(int(match.group(1)) - 1, 0)  # Minus header row
+    except (OSError, KeyError, zipfile.BadZipFile):
+        pass
+    return None
+
+
+# --- SUBCOMMANDS ---
+
+def cmd_status(args):
+    from src.store import store_path, count_rows
+    settings = _settings(args)
+    input_folder = settings.get("input_folder", "data/raw_pdfs")
+    output_file = settings.get("output_file", "data/results/slr_screened.xlsx")
+    store = store_path(settings)
+
+    total, counts = _scan_pdfs(input_folder)
+    print(f"📂 Input:   {input_folder}")
+    print(f"📄 PDFs on disk: {total}")
+    for folder, n in sorted(counts.items()):
+        print(f"   {n:>6}  {folder}")
+
+    # Prefer the columnar store (row count from its footer); fall back to a legacy workbook
+    if os.path.exists(store):
+        results, rows = store, count_rows(store)
+    elif os.path.exists(output_file):
+        results, rows = output_file, _xlsx_row_count(output_file)
+    else:
+        print(f"\n📊 Results: {store}")
+        print("   Not created yet. Run 'python slr.py screen'.")
+        return 0
+
+    print(f"\n📊 Results: {results}")
+    modified = time.strftime("%Y-%m-%d %H:%M", time.localtime(os.path.getmtime(results)))
+    print(f"   Rows: {rows if rows is not None else 'unknown'}  |  Last saved: {modified}")
+    if rows is not None and total:
+        print(f"   Progress: {min(rows, total)}/{total} ({min(rows, total) / total:.0%})")
+
+    from src.sandbox import quarantine_path, load_quarantine
+    quarantined = len(load_quarantine(quarantine_path(settings)))
+    if quarantined:
+        print(f"   Quarantined: {quarantined} PDFs (see 'python slr.py quarantine')")
+    return 0
+
+
+def cmd_screen(args):
+    import main as screener
+    if args.limit:
+        screener.TEST_LIMIT = args.limit
+    screener.main(config=args.config)
+    return 0
+
+
+def cmd_watch(args):
+    import watch
+    watch.main(interval=args.interval, config=args.config)
+    return 0
+
+
+def cmd_sample(args):
+    import main_random
+    if args.size:
+        main_random.SAMPLE_SIZE = args.size
+        main_random.VERIFICATION_PDF_NAME = f"Verification_Random_{args.size}.pdf"
+    main_random.main(config=args.config)
+    return 0
+
+
+def cmd_retry(args):
+    import retry_errors
+    retry_errors.main(config=args.config)
+    return 0
+
+
+def cmd_rescreen(args):
+    import rescreen
+    rescreen.main(dry_run=args.dry_run, config=args.config)
+    return 0
+
+
+def cmd_deep(args):
+    import deep
+    deep.main(dry_run=args.dry_run, config=args.config)
+    return 0
+
+
+def cmd_decide(args):
+    import decide
+    decide.main(policy_names=args.policy, apply=args.apply, output=args.output, config=args.config)
+    return 0
+
+
+def cmd_eval(args):
+    import evaluate
+    evaluate.main(gold_file=args.gold, record=args.record, metric=args.metric, output=args.output,
+                  config=args.config)
+    return 0
+
+
+def cmd_batch(args):
+    import batch_screen
+    batch_screen.main(stage=args.stage, config=args.config)
+    return 0
+
+
+def cmd_quarantine(args):
+    from src.sandbox import quarantine_path, load_quarantine, save_quarantine
+    path = quarantine_path(_settings(args))
+    entries = load_quarantine(path)
+    if not entries:
+        print("✅ No quarantined PDFs.")
+        return 0
+
+    for name, entry in sorted(entries.items()):
+        print(f"🚧 {name:<50} {entry['reason']}  ({entry['time']})")
+    if args.clear:
+        save_quarantine({}, path)
+        print(f"🧹 Cleared {len(entries)} entries; they will be parsed again on the next run.")
+    else:
+        print(f"\n{len(entries)} quarantined PDFs in {path}. Use --clear to retry them.")
+    return 0
+
+
+def cmd_missing(args):
+    import find_missing
+    find_missing.main(config=args.config)
+    return 0
+
+
+def cmd_duplicates(args):
+    import find_duplicates
+    find_duplicates.main()
+    return 0
+
+
+def cmd_verify(args):
+    import verify_pdfs
+    verify_pdfs.main(config=args.config)
+    return 0
+
+
+def cmd_export(args):
+    from src.utils import load_criteria, config_folder
+    from src.store import store_path, export_results, migrate_legacy_excel
+    from src.criteria import headers
+    from src.screening import prepare_criteria, criteria_ids, migrate_store
+    settings = _settings(args)
+    inc_list, exc_list = load_criteria(config_folder(args.config))
+    registry, _ = prepare_criteria(settings, inc_list, exc_list)
+    inc_ids, exc_ids = criteria_ids(registry)
+    store = store_path(settings)
+    migrate_legacy_excel(settings.get("output_file"), store, inc_ids, exc_ids)
+    if not os.path.exists(store):
+        print(f"❌ Results store not found at: {store}")
+        return 1
+    migrate_store(store, registry)
+
+    output = args.output or settings.get("output_file", "data/results/slr_screened.xlsx")
+    try:
+        rows = export_results(store, output, inc_ids, exc_ids, fmt=args.format, headers=headers(registry))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ Exported {rows} rows to: {output}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="slr", description="Auto-SLR-Screener command-line interface.")
+    parser.add_argument("--config", default=DEFAULT_SETTINGS, help="Path to settings.yaml (all commands; criteria files are read from its folder)")
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND")
+    sub.required = True
+
+    p = sub.add_parser("screen", help="Screen all PDFs (resumes from existing results)")
+    p.add_argument("--limit", type=int, default=None, help="Only process the first N files")
+    p.set_defaults(func=cmd_screen)
+
+    p = sub.add_parser("watch", help="Keep running and screen PDFs as they are added or changed")
+    p.add_argument("--interval", type=float, default=None, help="Seconds between folder polls")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("sample", help="Screen a random sample and build a verification PDF")
+    p.add_argument("--size", type=int, default=None, help="Number of random files")
+    p.set_defaults(func=cmd_sample)
+
+    p = sub.add_parser("retry", help="Retry papers that failed with API or parsing errors")
+    p.set_defaults(func=cmd_retry)
+
+    p = sub.add_parser("rescreen", help="Re-ask only added/changed criteria after editing the criteria files")
+    p.add_argument("--dry-run", action="store_true", help="Show the criteria diff and API cost, change nothing")
+    p.set_defaults(func=cmd_rescreen)
+
+    p = sub.add_parser("deep", help="Re-check undecided papers against the later pages of their PDF")
+    p.add_argument("--dry-run", action="store_true", help="Only count the undecided papers")
+    p.set_defaults(func=cmd_deep)
+
+    p = sub.add_parser("decide", help="Recompute include/exclude offline and compare decision policies")
+    p.add_argument("--policy", action="append", default=None,
+                   help="Policy name (repeatable; the first one is applied). Default: all configured")
+    p.add_argument("--apply", action="store_true", help="Write the first policy's decisions to the results")
+    p.add_argument("--output", default=None, help="Save the per-paper comparison as CSV")
+    p.set_defaults(func=cmd_decide)
+
+    p = sub.add_parser("batch", help="Screen offline through provider batch jobs (resumable stages)")
+    p.add_argument("stage", nargs="?", default="run",
+                   choices=["prepare", "submit", "poll", "ingest", "run", "status"],
+                   help="Stage to run (default: run = all stages, polling until done)")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("eval", help="Measure accuracy vs. throughput of a config grid on gold labels")
+    p.add_argument("--gold", default=None, help="Gold-labelled CSV (default: evaluation.gold_file)")
+    p.add_argument("--record", action="store_true", help="Call the API for responses missing from the cache")
+    p.add_argument("--metric", choices=["f1", "recall", "precision"], default="f1",
+                   help="Accuracy metric for ranking and the Pareto front")
+    p.add_argument("--output", default=None, help="Save per-configuration metrics as CSV")
+    p.set_defaults(func=cmd_eval)
+
+    p = sub.add_parser("quarantine", help="List PDFs skipped after a parsing timeout/memory limit")
+    p.add_argument("--clear", action="store_true", help="Empty the list so they are parsed again")
+    p.set_defaults(func=cmd_quarantine)
+
+    p = sub.add_parser("missing", help="List PDFs on disk that have no result row")
+    p.set_defaults(func=cmd_missing)
+
+    p = sub.add_parser("duplicates", help="Find duplicate filenames and identical PDF contents")
+    p.set_defaults(func=cmd_duplicates)
+
+    p = sub.add_parser("verify", help="Merge first pages into a verification PDF")
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser("export", help="Export the results store to .xlsx, .csv or .parquet")
+    p.add_argument("output", nargs="?", default=None, help="Destination file (default: output_file from settings)")
+    p.add_argument("--format", choices=["xlsx", "csv", "parquet"], default=None,
+                   help="Override the format implied by the file extension")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("status", help="Show PDF counts and screening progress")
+    p.set_defaults(func=cmd_status)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
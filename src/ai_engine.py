@@ -1,137 +1,201 @@
-import os
 import json
 import time
-from groq import Groq, RateLimitError
-from dotenv import load_dotenv
+import logging
 from src.logger import setup_logger
+from src.wire_format import COMPACT_RULES, compact_template, insights_hint, wire_options, decode, check_flags
+
+# Handlers are attached in AIEngine.__init__ so importing this module stays cheap
+logger = logging.getLogger("SLR_Logger")
+
+
+def build_messages(filename, text, inclusion, exclusion, confidence=False, metadata=True, known=None,
+                   compact=False, insights_words=None):
+    """
+    Builds the screening chat messages. With `confidence`, the model also rates
+    how certain it is of its flags (used by the cascade). With metadata=False
+    only the criteria are asked (incremental re-screening); fields in `known`
+    were resolved locally (src/metadata.py) and are left out of the template.
+    `compact` asks for the short wire format (src/wire_format.py) and
+    `insights_words` caps (or with 0, drops) the Insights summary.
+    """
+    # Format criteria
+    inc_str = "\n".join([f"{i+1}. {c}" for i, c in enumerate(inclusion)])
+    exc_str = "\n".join([f"{i+1}. {c}" for i, c in enumerate(exclusion)])
+
+    # JSON Template
+    inc_keys = {f"Inc_{i+1}": 0 for i in range(len(inclusion))}
+    exc_keys = {f"Exc_{i+1}": 0 for i in range(len(exclusion))}
+    
+    example_json = {
+        "Extracted_Title": "Full Title",
+        "Inclusion_Breakdown": inc_keys,
+        "Exclusion_Breakdown": exc_keys,
+        "Review_Research_Type": "Research Paper",
+        "Publication_Type": "Journal",
+        "Publisher": "IEEE",
+        "Venue_Name": "IEEE Access",
+        "First_Author_Name": "Name",
+        "First_Author_Country": "Country",
+        "Study_Area_Country": "Country",
+        "Insights": insights_hint(insights_words)
+    }
+    if insights_words == 0:
+        example_json.pop("Insights")
+    for key in known or ():
+        example_json.pop(key, None)
+    task = "1. Extract Metadata.\n    2. Evaluate EACH criteria strictly."
+    if not metadata:
+        example_json = {"Inclusion_Breakdown": inc_keys, "Exclusion_Breakdown": exc_keys}
+        task = "1. Evaluate EACH criteria strictly. Do not extract metadata."
+    confidence_rule = ""
+    if confidence:
+        example_json["Confidence"] = 0.5
+        confidence_rule = "3. Set Confidence (0.0-1.0) to how certain you are that EVERY criteria flag is correct."
+    if compact:
+        example_json = compact_template(example_json, len(inclusion), len(exclusion))
+        if confidence:
+            confidence_rule = "3. Set c (0.0-1.0) to how certain you are that EVERY criteria flag is correct.\n    "
+        confidence_rule += COMPACT_RULES
+    
+    prompt = f"""
+    You are a strict Research Assistant for a Systematic Literature Review.
+    FILE: {filename}
+    TEXT: {text}
+
+    TASK: 
+    {task}
+    {confidence_rule}
+    
+    CRITICAL CONTEXT:
+    - Synonyms for Sugarcane: "Saccharum", "Saccharum officinarum", "Sugar crop".
+    - Diseases: "Pokkah Boeng", "Red Rot", "Smut", "Grassy Shoot", "White Leaf", "Yellow Leaf".
+    - AI Methods: "Deep Learning", "CNN", "SVM", "Random Forest", "Fuzzy Logic", "UAV imagery".
+
+    INCLUSION CRITERIA (1 = Met, 0 = Not Met):
+    {inc_str}
+
+    EXCLUSION CRITERIA (1 = Met [Exclude], 0 = Not Met [Keep]):
+    {exc_str}
+
+    OUTPUT FORMAT (JSON ONLY):
+    {json.dumps(example_json)}
+    """
+
+    messages = [
+        {"role": "system", "content": "You are a JSON-only bot. Extract metadata and flag criteria."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages
+
+
+def failure_response(inclusion, exclusion, error):
+    """Placeholder row for a paper whose request failed permanently."""
+    inc_keys = {f"Inc_{i+1}": 0 for i in range(len(inclusion))}
+    exc_keys = {f"Exc_{i+1}": 0 for i in range(len(exclusion))}
+    return {
+        "Research Paper Title": "Error",
+        "Inclusion_Breakdown": inc_keys,
+        "Exclusion_Breakdown": exc_keys,
+        "Included/Excluded": 0,
+        "Insights": f"API FAILURE: {error}",
+        "Category": "Error",
+        "Publication": "Error",
+        "Journal/Conference Paper": "Error",
+        "First Author Name": "Error",
+        "First Author’s Country Name": "Error",
+        "Study Area Country Name": "Error"
+    }
+
+
+class AIRequestError(Exception):
+    """Raised when a request fails on every attempt across all providers."""
 
-load_dotenv()
-logger = setup_logger()
 
 class AIEngine:
-    def __init__(self):
-        # Load keys from .env
-        keys_str = os.getenv("GROQ_API_KEYS") or os.getenv("GROQ_API_KEY")
-        if not keys_str:
+    def __init__(self, settings=None, providers=None):
+        # Heavy SDK imports are deferred until an engine is actually needed
+        from dotenv import load_dotenv
+        from src.providers import Router, build_providers
+        from src.hedging import Hedger
+        load_dotenv()
+        setup_logger()
+        settings = settings or {}
+
+        # Providers come from settings.yaml; default is Groq with keys from .env
+        if providers is None:
+            providers = build_providers(settings.get("providers"), settings.get("request_timeout", 120))
+        if not providers:
             logger.critical("FATAL: No API keys found in .env.")
             raise ValueError("FATAL: No API keys found.")
-        
-        # Clean and store keys
-        self.keys = [k.strip() for k in keys_str.split(',') if k.strip()]
-        self.current_key_index = 0
-        
-        # Initialize first key
-        self.client = Groq(api_key=self.keys[0])
-        
-        # Log startup (Masked key)
-        masked = "..." + self.keys[0][-4:]
-        logger.info(f"🔹 AI Engine Initialized with {len(self.keys)} keys. Active: Key #1 ({masked})")
-
-    def switch_key(self):
-        """Switches to the next available API key."""
-        self.current_key_index = (self.current_key_index + 1) % len(self.keys)
-        new_key = self.keys[self.current_key_index]
-        masked = "..." + new_key[-4:]
-        
-        logger.warning(f"⚠️ Rate Limit Hit! Rotating to Key #{self.current_key_index + 1} ({masked})...")
-        self.client = Groq(api_key=new_key)
-
-    def analyze_paper(self, filename, text, inclusion, exclusion, model, temperature):
-        # Format criteria
-        inc_str = "\n".join([f"{i+1}. {c}" for i, c in enumerate(inclusion)])
-        exc_str = "\n".join([f"{i+1}. {c}" for i, c in enumerate(exclusion)])
-
-        # JSON Template
-        inc_keys = {f"Inc_{i+1}": 0 for i in range(len(inclusion))}
-        exc_keys = {f"Exc_{i+1}": 0 for i in range(len(exclusion))}
-        
-        example_json = {
-            "Extracted_Title": "Full Title",
-            "Inclusion_Breakdown": inc_keys,
-            "Exclusion_Breakdown": exc_keys,
-            "Review_Research_Type": "Research Paper",
-            "Publication_Type": "Journal",
-            "Publisher": "IEEE",
-            "Venue_Name": "IEEE Access",
-            "First_Author_Name": "Name",
-            "First_Author_Country": "Country",
-            "Study_Area_Country": "Country",
-            "Insights": "Summary"
-        }
-        
-        prompt = f"""
-        You are a strict Research Assistant for a Systematic Literature Review.
-        FILE: {filename}
-        TEXT: {text}
-
-        TASK: 
-        1. Extract Metadata.
-        2. Evaluate EACH criteria strictly.
-        
-        CRITICAL CONTEXT:
-        - Synonyms for Sugarcane: "Saccharum", "Saccharum officinarum", "Sugar crop".
-        - Diseases: "Pokkah Boeng", "Red Rot", "Smut", "Grassy Shoot", "White Leaf", "Yellow Leaf".
-        - AI Methods: "Deep Learning", "CNN", "SVM", "Random Forest", "Fuzzy Logic", "UAV imagery".
-
-        INCLUSION CRITERIA (1 = Met, 0 = Not Met):
-        {inc_str}
-
-        EXCLUSION CRITERIA (1 = Met [Exclude], 0 = Not Met [Keep]):
-        {exc_str}
-
-        OUTPUT FORMAT (JSON ONLY):
-        {json.dumps(example_json)}
+
+        self.router = Router(providers)
+        self.hedger = Hedger(self.router, settings)  # Request deadlines + optional hedging
+        self.keys = [k for p in providers for k in p.keys]
+        self.max_capacity_wait = settings.get("max_capacity_wait", 90)
+        self.compact, self.insights_words = wire_options(settings)
+
+        logger.info(f"🔹 AI Engine Initialized with {len(self.keys)} keys across "
+                    f"{len(providers)} provider(s): {self.router.describe()}")
+
+    def complete(self, messages, model, temperature, json_mode=True, parse=None, label=""):
+        """
+        Sends one chat request through the router, retrying on rate limits,
+        transient errors and (if `parse` is given) unparseable output.
+        Returns (parsed_or_raw_content, Completion).
         """
+        from src.providers import RateLimited, NoCapacity
 
         max_retries = len(self.keys) + 2
         last_error = "Unknown Error" # Initialize variable to prevent UnboundLocalError
-        
+
         for attempt in range(max_retries):
             try:
-                # Log usage
-                if attempt == 0:
-                    logger.debug(f"Processing: {filename} (Key #{self.current_key_index + 1})")
-
-                completion = self.client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": "You are a JSON-only bot. Extract metadata and flag criteria."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=temperature,
-                    response_format={"type": "json_object"}
-                )
-                
-                logger.info(f"✅ AI Success: {filename}")
-                return json.loads(completion.choices[0].message.content)
-            
-            except RateLimitError:
-                if attempt < max_retries - 1:
-                    logger.warning(f"Rate Limit (429) on {filename}. Switching keys...")
-                    self.switch_key()
-                    continue
-                else:
-                    last_error = "Rate Limit Exhausted"
-                    logger.error(f"❌ All {len(self.keys)} keys exhausted on {filename}.")
+                completion = self.hedger.complete(messages, model, temperature, json_mode)
+                content = parse(completion.content) if parse else completion.content
+                logger.debug(f"{label} answered by {completion.provider} "
+                             f"key #{completion.key_index + 1} in {completion.latency:.1f}s")
+                return content, completion
+
+            except RateLimited:
+                last_error = "Rate Limit Exhausted"
+                logger.warning(f"Rate Limit (429) on {label}. Re-routing...")
+
+            except NoCapacity as e:
+                # Every provider is cooling down: wait it out rather than failing the paper
+                last_error = "Rate Limit Exhausted"
+                if e.wait_seconds > self.max_capacity_wait:
+                    logger.error(f"❌ All {len(self.keys)} keys exhausted on {label}.")
+                    break
+                logger.warning(f"⏳ All providers busy. Waiting {e.wait_seconds:.0f}s...")
+                time.sleep(e.wait_seconds)
 
             except Exception as e:
                 # Capture the error message here so it survives the loop
                 last_error = str(e)
-                logger.error(f"⚠️ API Error (Attempt {attempt+1}) on {filename}: {last_error}")
+                logger.error(f"⚠️ API Error (Attempt {attempt+1}) on {label}: {last_error}")
                 time.sleep(2)
 
+        raise AIRequestError(last_error)
+
+    def analyze_paper(self, filename, text, inclusion, exclusion, model, temperature,
+                      confidence=False, metadata=True, known=None):
+        """Asks the model for metadata and per-criterion flags (see build_messages)."""
+        messages = build_messages(filename, text, inclusion, exclusion, confidence, metadata, known,
+                                  self.compact, self.insights_words)
+        logger.debug(f"Processing: {filename}")
+
+        # Compact answers are expanded right away, so callers always see the full format;
+        # undecodable flags are retried like bad JSON instead of being read as 0
+        def parse(content):
+            return check_flags(decode(json.loads(content), len(inclusion), len(exclusion)))
+
+        try:
+            response, _ = self.complete(messages, model, temperature, parse=parse, label=filename)
+            logger.info(f"✅ AI Success: {filename}")
+            return response
+        except AIRequestError as e:
+            last_error = str(e)
+
         # Permanent Failure
         logger.error(f"🚨 PERMANENT FAILURE: {filename}")
-        return {
-            "Research Paper Title": "Error",
-            "Inclusion_Breakdown": inc_keys,
-            "Exclusion_Breakdown": exc_keys,
-            "Included/Excluded": 0,
-            "Insights": f"API FAILURE: {last_error}", # Now safely uses last_error
-            "Category": "Error",
-            "Publication": "Error",
-            "Journal/Conference Paper": "Error",
-            "First Author Name": "Error",
-            "First Author’s Country Name": "Error",
-            "Study Area Country Name": "Error"
-        }
\ No newline at end of file
+        return failure_response(inclusion, exclusion, last_error)
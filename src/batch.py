@@ -0,0 +1,177 @@
+"""
+Offline batch jobs.
+
+Pending prompts are serialized as OpenAI-style batch JSONL request files,
+submitted either to a provider's /batches endpoint (Groq and other
+OpenAI-compatible APIs) or to a local stand-in that executes them through
+the normal AIEngine router, and their output files are parsed back into
+(custom_id, content) pairs. Job progress is checkpointed in a JSON state
+file so every stage can be interrupted and resumed.
+"""
+import os
+import json
+import uuid
+import logging
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger("SLR_Logger")
+
+ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+# --- REQUEST FILES ---
+
+def request_line(custom_id, messages, model, temperature):
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": ENDPOINT,
+        "body": {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "response_format": {"type": "json_object"},
+        },
+    }
+
+
+def write_jsonl(path, records):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+
+def read_jsonl(path):
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping corrupt line in {path}")
+    return records
+
+
+def parse_output_line(record):
+    """Returns (custom_id, content, error) for one line of a batch output file."""
+    custom_id = record.get("custom_id")
+    if record.get("error"):
+        return custom_id, None, str(record["error"].get("message", record["error"]))
+
+    response = record.get("response") or {}
+    if response.get("status_code", 200) != 200:
+        return custom_id, None, f"HTTP {response.get('status_code')}"
+    try:
+        return custom_id, response["body"]["choices"][0]["message"]["content"], None
+    except (KeyError, IndexError, TypeError):
+        return custom_id, None, "Malformed batch output line"
+
+
+# --- JOB STATE (CHECKPOINT) ---
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {"jobs": []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# --- REMOTE BATCH API ---
+
+class BatchAPI:
+    """Minimal client for the OpenAI-compatible Files + Batches endpoints."""
+
+    def __init__(self, base_url, api_key, timeout=300):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def _request(self, method, path, data=None, content_type="application/json"):
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if data is not None:
+            headers["Content-Type"] = content_type
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return resp.read()
+
+    def upload(self, path):
+        boundary = uuid.uuid4().hex
+        with open(path, 'rb') as f:
+            content = f.read()
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"purpose\"\r\n\r\nbatch\r\n"
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; "
+            f"filename=\"{os.path.basename(path)}\"\r\nContent-Type: application/jsonl\r\n\r\n"
+        ).encode("utf-8") + content + f"\r\n--{boundary}--\r\n".encode("utf-8")
+        raw = self._request("POST", "/files", body, f"multipart/form-data; boundary={boundary}")
+        return json.loads(raw)["id"]
+
+    def create(self, file_id, completion_window="24h"):
+        payload = json.dumps({"input_file_id": file_id, "endpoint": ENDPOINT,
+                              "completion_window": completion_window}).encode("utf-8")
+        return json.loads(self._request("POST", "/batches", payload))
+
+    def get(self, batch_id):
+        return json.loads(self._request("GET", f"/batches/{batch_id}"))
+
+    def download(self, file_id, path):
+        content = self._request("GET", f"/files/{file_id}/content")
+        with open(path + ".tmp", 'wb') as f:
+            f.write(content)
+        os.replace(path + ".tmp", path)
+
+
+# --- LOCAL STAND-IN ---
+
+def run_local(request_path, output_path, ai, workers=4):
+    """
+    Executes a request file through AIEngine (router, key rotation, overflow)
+    and appends results in batch output format. Lines already present in the
+    output file are skipped, so an interrupted run resumes where it stopped.
+    Threads are capped at what the router lets in flight.
+    """
+    from src.ai_engine import AIRequestError
+
+    workers = max(min(workers, sum(p.max_concurrency for p in ai.router.providers)), 1)
+
+    done = {r.get("custom_id") for r in read_jsonl(output_path)}
+    pending = [r for r in read_jsonl(request_path) if r["custom_id"] not in done]
+    logger.info(f"🏠 Local batch: {len(pending)} requests pending ({len(done)} already done)")
+
+    def execute(record):
+        body = record["body"]
+        json_mode = "response_format" in body
+        try:
+            content, completion = ai.complete(body["messages"], body["model"], body.get("temperature", 0.0),
+                                              json_mode=json_mode, label=record["custom_id"])
+        except AIRequestError as e:
+            return {"custom_id": record["custom_id"], "response": None,
+                    "error": {"message": str(e)}}  # failure_response adds "API FAILURE: "
+        return {"custom_id": record["custom_id"], "error": None,
+                "response": {"status_code": 200, "body": {
+                    "choices": [{"message": {"role": "assistant", "content": content}}],
+                    "usage": completion.usage}}}
+
+    with open(output_path, 'a', encoding='utf-8') as out:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(execute, r) for r in pending]
+            for future in as_completed(futures):
+                out.write(json.dumps(future.result(), ensure_ascii=False) + "\n")
+                out.flush()
+    return len(pending)
@@ -0,0 +1,111 @@
+"""
+Two-stage model cascade.
+
+A small, fast model screens every paper and rates its own confidence. Only
+papers whose answer is uncertain or borderline are re-screened on the large
+model (`model_id`). The strict include/exclude decision is still made in
+Python from the final flags, exactly as without the cascade.
+"""
+import time
+import logging
+
+logger = logging.getLogger("SLR_Logger")
+
+
+def _flags(response, key, prefix, count):
+    data = response.get(key) or {}
+    return [data.get(f"{prefix}_{i+1}", 0) for i in range(count)]
+
+
+def escalation_reason(response, n_inc, n_exc, threshold):
+    """Returns why the small model's answer needs the large model, or None."""
+    if not response or str(response.get("Insights", "")).startswith("API FAILURE"):
+        return "failed"
+
+    inc = _flags(response, "Inclusion_Breakdown", "Inc", n_inc)
+    exc = _flags(response, "Exclusion_Breakdown", "Exc", n_exc)
+    if any(v not in (0, 1) for v in inc + exc):
+        return "malformed flags"
+
+    try:
+        confidence = float(response.get("Confidence"))
+    except (TypeError, ValueError):
+        return "no confidence"
+    if confidence < threshold:
+        return "low confidence"
+
+    # A paper is only kept on inclusion hits with zero exclusion hits. That is the
+    # decision a false positive would come from, so the large model confirms it.
+    if sum(inc) > 0 and sum(exc) == 0:
+        return "inclusion candidate"
+    return None
+
+
+class CascadeScreener:
+    """Drop-in replacement for AIEngine.analyze_paper that cascades small -> large."""
+
+    def __init__(self, ai, settings):
+        cfg = settings.get("cascade") or {}
+        self.ai = ai
+        self.screen_model = cfg.get("screen_model", "llama-3.1-8b-instant")
+        self.threshold = cfg.get("confidence_threshold", 0.8)
+        self.base_sleep = settings.get("sleep_seconds", 20)
+        # The small model has a much higher TPM budget, so it can be paced faster
+        self.sleep_seconds = cfg.get("sleep_seconds", self.base_sleep)
+
+        self.screened = 0
+        self.escalated = 0
+        self.reasons = {}
+        self.small_time = 0.0
+        self.large_time = 0.0
+        self.last_escalated = False
+
+    def analyze_paper(self, filename, text, inclusion, exclusion, model, temperature, known=None):
+        self.screened += 1
+
+        start = time.time()
+        response = self.ai.analyze_paper(filename, text, inclusion, exclusion,
+                                         self.screen_model, temperature, confidence=True, known=known)
+        self.small_time += time.time() - start
+
+        reason = escalation_reason(response, len(inclusion), len(exclusion), self.threshold)
+        self.last_escalated = reason is not None
+        if not reason:
+            return response
+
+        self.escalated += 1
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        logger.debug(f"⤴️ Escalating {filename} to {model} ({reason})")
+
+        start = time.time()
+        response = self.ai.analyze_paper(filename, text, inclusion, exclusion, model, temperature, known=known)
+        self.large_time += time.time() - start
+        return response
+
+    def pause(self):
+        """Seconds to sleep after the last paper, depending on which model served it."""
+        return self.base_sleep if self.last_escalated else self.sleep_seconds
+
+    def summary(self, elapsed=None):
+        """Short report of escalation rate and throughput gained."""
+        if not self.screened:
+            return "Cascade: no papers screened."
+
+        rate = self.escalated / self.screened
+        lines = [f"Cascade: {self.screened} papers screened with {self.screen_model}, "
+                 f"{self.escalated} escalated ({rate:.0%})."]
+        if self.reasons:
+            lines.append("   Reasons: " + ", ".join(f"{k}={v}" for k, v in sorted(self.reasons.items())))
+
+        # Large-only cost is estimated from the large-model calls we did make
+        if self.escalated:
+            large_avg = self.large_time / self.escalated
+            actual = (self.small_time + self.large_time) / self.screened
+            lines.append(f"   Avg API time/paper: {actual:.1f}s vs ~{large_avg:.1f}s large-only "
+                         f"(~{large_avg / max(actual, 1e-6):.1f}x throughput, excluding sleep).")
+            if elapsed:
+                achieved = self.screened / elapsed * 60
+                large_only = 60 / (large_avg + self.base_sleep)
+                lines.append(f"   Wall clock: {achieved:.1f} papers/min vs ~{large_only:.1f} papers/min "
+                             f"large-only at sleep_seconds={self.base_sleep}.")
+        return "\n".join(lines)
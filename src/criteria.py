@@ -0,0 +1,155 @@
+"""
+Versioned inclusion/exclusion criteria with stable IDs.
+
+Each line of config/inclusion.txt / exclusion.txt is tracked in a registry
+(data/results/criteria_registry.json) as INC_n / EXC_n. Results store one
+column per ID plus a "Criteria Hashes" stamp recording which wording each
+answer was given for, so editing one line only invalidates that criterion.
+"""
+import os
+import json
+import hashlib
+import difflib
+
+DEFAULT_REGISTRY = "data/results/criteria_registry.json"
+HASHES_COL = "Criteria Hashes"
+KINDS = {"inclusion": "INC", "exclusion": "EXC"}
+
+# Edited lines at least this similar to an old line keep its ID (as a new version)
+SIMILARITY_THRESHOLD = 0.5
+
+
+def criterion_hash(text):
+    return hashlib.sha1(" ".join(text.split()).lower().encode("utf-8")).hexdigest()[:10]
+
+
+def registry_path(settings):
+    return settings.get("criteria_registry", DEFAULT_REGISTRY)
+
+
+def load_registry(path):
+    if not os.path.exists(path):
+        return {"revision": 0, "criteria": []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_registry(registry, path):
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def active(registry, kind=None):
+    """Active criteria in file order, optionally for one kind."""
+    items = [c for c in registry["criteria"] if c["active"] and (kind is None or c["kind"] == kind)]
+    return sorted(items, key=lambda c: (c["kind"] != "inclusion", c["position"]))
+
+
+def _next_id(registry, kind):
+    prefix = KINDS[kind]
+    used = [int(c["id"].split("_")[1]) for c in registry["criteria"] if c["kind"] == kind]
+    return f"{prefix}_{max(used, default=0) + 1}"
+
+
+def sync_registry(registry, inc_list, exc_list):
+    """
+    Reconciles the registry with the current criteria files. Returns a diff
+    dict with lists of criteria under "added", "changed", "removed", "unchanged".
+    Matching: identical text keeps its ID; otherwise the most similar unmatched
+    old line keeps its ID as a new version; anything else gets a new ID.
+    """
+    diff = {"added": [], "changed": [], "removed": [], "unchanged": []}
+
+    for kind, lines in (("inclusion", inc_list), ("exclusion", exc_list)):
+        old = {c["id"]: c for c in active(registry, kind)}
+        pending = []
+
+        # 1. Exact matches (wording unchanged, maybe moved)
+        for pos, text in enumerate(lines):
+            match = next((c for c in old.values() if c["hash"] == criterion_hash(text)), None)
+            if match:
+                match["position"] = pos
+                match["text"] = text
+                diff["unchanged"].append(match)
+                del old[match["id"]]
+            else:
+                pending.append((pos, text))
+
+        # 2. Edited lines: best fuzzy match among the remaining old criteria
+        for pos, text in pending:
+            scored = [(difflib.SequenceMatcher(None, c["text"].lower(), text.lower()).ratio(), c)
+                      for c in old.values()]
+            score, match = max(scored, key=lambda s: s[0], default=(0, None))
+            if match and score >= SIMILARITY_THRESHOLD:
+                match.update(text=text, hash=criterion_hash(text), position=pos,
+                             version=match["version"] + 1)
+                diff["changed"].append(match)
+                del old[match["id"]]
+            else:
+                new = {"id": _next_id(registry, kind), "kind": kind, "text": text,
+                       "hash": criterion_hash(text), "version": 1, "position": pos, "active": True}
+                registry["criteria"].append(new)
+                diff["added"].append(new)
+
+        # 3. Lines that disappeared
+        for c in old.values():
+            c["active"] = False
+            diff["removed"].append(c)
+
+    if diff["added"] or diff["changed"] or diff["removed"]:
+        registry["revision"] = registry.get("revision", 0) + 1
+    return diff
+
+
+def describe_diff(diff):
+    lines = []
+    for key, symbol in (("added", "+"), ("changed", "~"), ("removed", "-")):
+        for c in diff[key]:
+            lines.append(f"   {symbol} {c['id']} (v{c['version']}): {c['text'][:70]}")
+    return "\n".join(lines) or "   No criteria changes."
+
+
+def headers(registry):
+    """Maps criterion ID columns to their current wording for human-facing exports."""
+    return {c["id"]: c["text"] for c in active(registry)}
+
+
+def migrate_columns(df, registry):
+    """
+    Renames legacy criterion-text columns to IDs. Rows that already had an answer
+    under the current wording get it stamped in the Criteria Hashes column.
+    """
+    by_text = {c["text"]: c for c in registry["criteria"]}
+    renames = {col: by_text[col]["id"] for col in df.columns
+               if col in by_text and by_text[col]["id"] not in df.columns}
+    if not renames:
+        return df
+
+    df = df.rename(columns=renames)
+    stamp = {by_text[text]["id"]: by_text[text]["hash"] for text in renames}
+    if HASHES_COL not in df.columns:
+        df[HASHES_COL] = None
+    df[HASHES_COL] = [json.dumps({**stamp, **read_hashes(v)}) for v in df[HASHES_COL]]
+    return df
+
+
+def read_hashes(value):
+    """Parses a row's Criteria Hashes cell (JSON) into a dict."""
+    if isinstance(value, dict):
+        return value
+    if not isinstance(value, str) or not value:
+        return {}
+    try:
+        return json.loads(value)
+    except ValueError:
+        return {}
+
+
+def stale_criteria(row_hashes, criteria):
+    """Criteria whose stored answer was given for a different (or no) wording."""
+    return [c for c in criteria if row_hashes.get(c["id"]) != c["hash"]]
@@ -0,0 +1,90 @@
+"""
+Vectorized include/exclude rule engine.
+
+The stored paper-by-criterion flags are loaded as 0/1 NumPy matrices and a
+declarative policy is evaluated over all papers at once:
+
+    inc_score = F_inc @ inclusion_weights
+    exc_score = F_exc @ exclusion_weights
+    include   = (inc_score >= min_inclusion) & (exc_score <= max_exclusion) & all(require)
+
+The default "strict" policy is the rule this project has always used: any
+exclusion hit rejects, and at least one inclusion hit is required.
+"""
+import numpy as np
+
+STRICT_POLICY = {"name": "strict", "min_inclusion": 1, "max_exclusion": 0}
+
+
+def flag_matrix(df, ids):
+    """Papers x criteria uint8 matrix; anything other than 1 (NaN, 0, 'Error') is 0."""
+    if not len(ids):
+        return np.zeros((len(df), 0), dtype=np.uint8)
+    cols = [df[i].to_numpy() if i in df.columns else np.zeros(len(df)) for i in ids]
+    values = np.stack(cols, axis=1)
+    return (values == 1).astype(np.uint8)
+
+
+def _weights(ids, weights):
+    weights = weights or {}
+    return np.array([float(weights.get(i, 1.0)) for i in ids])
+
+
+def evaluate(policy, inc_flags, exc_flags, inc_ids, exc_ids):
+    """Applies one policy to flag matrices. Returns an int8 vector of 0/1 decisions."""
+    inc_score = inc_flags @ _weights(inc_ids, policy.get("inclusion_weights"))
+    exc_score = exc_flags @ _weights(exc_ids, policy.get("exclusion_weights"))
+
+    include = (inc_score >= policy.get("min_inclusion", 1)) & (exc_score <= policy.get("max_exclusion", 0))
+
+    required = [inc_ids.index(i) for i in policy.get("require", []) if i in inc_ids]
+    if required:
+        include &= inc_flags[:, required].all(axis=1)
+    return include.astype(np.int8)
+
+
+def decide(df, policy, inc_ids, exc_ids):
+    """Decisions for a whole result set."""
+    return evaluate(policy, flag_matrix(df, inc_ids), flag_matrix(df, exc_ids), inc_ids, exc_ids)
+
+
+def decide_row(meta, policy, inc_ids, exc_ids):
+    """Single-paper decision (same code path as the bulk engine)."""
+    inc = np.array([[1 if meta.get(i) == 1 else 0 for i in inc_ids]], dtype=np.uint8)
+    exc = np.array([[1 if meta.get(i) == 1 else 0 for i in exc_ids]], dtype=np.uint8)
+    return int(evaluate(policy, inc, exc, inc_ids, exc_ids)[0])
+
+
+def load_policies(settings):
+    """All configured policies keyed by name, always including 'strict'."""
+    policies = {"strict": STRICT_POLICY}
+    for p in settings.get("decision_policies") or []:
+        policies[p["name"]] = p
+    return policies
+
+
+def active_policy(settings):
+    name = settings.get("decision_policy", "strict")
+    policies = load_policies(settings)
+    if name not in policies:
+        raise ValueError(f"Unknown decision_policy '{name}' (defined: {', '.join(policies)})")
+    return policies[name]
+
+
+def compare(df, policies, inc_ids, exc_ids):
+    """
+    Evaluates several policies side by side. Returns (decisions, summary):
+    a papers x policies 0/1 matrix and per-policy rows of
+    (name, included, share, agreement with the first policy, gained, lost).
+    """
+    inc_flags, exc_flags = flag_matrix(df, inc_ids), flag_matrix(df, exc_ids)
+    decisions = np.stack([evaluate(p, inc_flags, exc_flags, inc_ids, exc_ids) for p in policies], axis=1)
+
+    base = decisions[:, 0]
+    n = max(len(df), 1)
+    summary = []
+    for j, p in enumerate(policies):
+        d = decisions[:, j]
+        summary.append((p["name"], int(d.sum()), d.sum() / n, float((d == base).mean()) if len(df) else 1.0,
+                        int(((d == 1) & (base == 0)).sum()), int(((d == 0) & (base == 1)).sum())))
+    return decisions, summary
@@ -0,0 +1,161 @@
+"""
+Deep screening of papers the first pages left undecided.
+
+The first pass only reads page 1 (plus page 2 if page 1 is short), so a paper
+whose methods or results come later can be rejected as "No Match" only for
+lack of evidence. For such papers (excluded, but with no exclusion hit) the
+rest of the PDF is split into token-budgeted chunks and only the criteria
+that are still open (flag 0) are asked on each chunk, several chunks at a
+time across the available keys. Answers are OR-reduced: a criterion met in
+any chunk is met. Chunks are dispatched as earlier ones finish, so criteria
+found met are not asked again, and the paper stops as soon as an exclusion
+criterion hits (the decision can no longer become an inclusion).
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.decision import decide_row
+
+logger = logging.getLogger("SLR_Logger")
+
+CHARS_PER_TOKEN = 4  # Same estimate as pdf_char_limit (3500 chars ~ 900 tokens)
+DEEP_COL = "Deep Screen"
+
+
+def chunk_text(text, max_chars):
+    """Splits text into chunks of at most max_chars, preferring line breaks."""
+    chunks, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:  # A single huge line (no line breaks in the PDF text)
+            cut = line.rfind(" ", 0, max_chars) + 1 or max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:cut])
+            line = line[cut:]
+        if len(current) + len(line) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += line
+    if current.strip():
+        chunks.append(current)
+    return [c for c in chunks if c.strip()]
+
+
+def is_undecided(meta, exc_criteria):
+    """Rejected only for lack of inclusion evidence (no exclusion hit, readable, no API error)."""
+    if str(meta.get("Included/Excluded")) not in ("0", "0.0"):
+        return False
+    if str(meta.get("Research Paper Title")) == "Unreadable PDF" or "API FAILURE" in str(meta.get("Insights", "")):
+        return False
+    return not any(meta.get(c["id"]) == 1 for c in exc_criteria)
+
+
+class DeepScreener:
+    """OR-reduces open-criteria answers over the later chunks of a paper."""
+
+    def __init__(self, ai, settings):
+        cfg = settings.get("deep_screen") or {}
+        self.ai = ai
+        self.enabled = cfg.get("enabled", False)
+        self.model = cfg.get("model") or settings.get("model_id")
+        self.temperature = settings.get("temperature", 0.0)
+        self.chunk_tokens = cfg.get("chunk_tokens", 1000)
+        self.chunk_chars = self.chunk_tokens * CHARS_PER_TOKEN
+        self.max_chars = cfg.get("max_tokens", 10000) * CHARS_PER_TOKEN
+        self.workers = cfg.get("workers") or len(ai.keys)
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="deep")
+
+        self.papers = 0
+        self.changed = 0
+        self.calls = 0
+        self.skipped_chunks = 0
+        self.unreadable = 0
+
+    def _ask(self, filename, chunk, inc, exc):
+        return self.ai.analyze_paper(filename, chunk, [c["text"] for c in inc], [c["text"] for c in exc],
+                                     self.model, self.temperature, metadata=False)
+
+    def reduce(self, filename, text, inc_open, exc_open):
+        """
+        Asks the open criteria on every chunk of `text` (at most `workers` at a
+        time). Returns (ids met, chunks answered, chunks total).
+        """
+        chunks = chunk_text(text, self.chunk_chars)
+        met = set()
+        answered = 0
+        running = {}
+        queue = list(enumerate(chunks, start=1))
+
+        while queue or running:
+            # 1. Dispatch chunks with the criteria still open at this moment
+            inc = [c for c in inc_open if c["id"] not in met]
+            exc = [c for c in exc_open if c["id"] not in met]
+            stop = not (inc or exc) or any(c["id"] in met for c in exc_open)
+            while queue and not stop and len(running) < self.workers:
+                n, chunk = queue.pop(0)
+                future = self.pool.submit(self._ask, f"{filename} [part {n}/{len(chunks)}]", chunk, inc, exc)
+                running[future] = (inc, exc)
+                self.calls += 1
+            if stop:
+                break
+
+            # 2. OR-reduce answers as they arrive
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                inc, exc = running.pop(future)
+                response = future.result()
+                if "API FAILURE" in str(response.get("Insights", "")):
+                    continue
+                answered += 1
+                for key, prefix, criteria in (("Inclusion_Breakdown", "Inc", inc),
+                                              ("Exclusion_Breakdown", "Exc", exc)):
+                    data = response.get(key) or {}
+                    met.update(c["id"] for i, c in enumerate(criteria) if data.get(f"{prefix}_{i+1}") == 1)
+
+        # Early stop: chunks never sent are skipped, requests in flight are not waited for
+        self.skipped_chunks += len(queue)
+        for future in running:
+            future.cancel()
+        return met, answered, len(chunks)
+
+    def screen(self, meta, text, inc_criteria, exc_criteria, policy):
+        """
+        Deep-screens one undecided row in place from the text after the first
+        pass. Returns True if any flag changed.
+        """
+        inc_open = [c for c in inc_criteria if meta.get(c["id"]) != 1]
+        exc_open = [c for c in exc_criteria if meta.get(c["id"]) != 1]
+        if len(text) < 50 or not (inc_open or exc_open):
+            meta[DEEP_COL] = "no further text"
+            return False
+
+        self.papers += 1
+        met, answered, total = self.reduce(meta["File Name"], text, inc_open, exc_open)
+        if not answered:
+            logger.error(f"Deep screen failed, keeping first-pass answers: {meta['File Name']}")
+            return False
+
+        for c in inc_open + exc_open:
+            if c["id"] in met:
+                meta[c["id"]] = 1
+        meta["Included/Excluded"] = decide_row(meta, policy, [c["id"] for c in inc_criteria],
+                                               [c["id"] for c in exc_criteria])
+        meta[DEEP_COL] = f"{answered}/{total} chunks" + (f": {', '.join(sorted(met))}" if met else "")
+        if met:
+            self.changed += 1
+            logger.info(f"🔬 Deep screen {meta['File Name']}: {', '.join(sorted(met))} met in later pages"
+                        + (" -> INCLUDED" if meta["Included/Excluded"] == 1 else ""))
+        return bool(met)
+
+    def skip(self, filename, error):
+        """Records an undecided paper whose later pages could not be parsed."""
+        self.unreadable += 1
+        logger.error(f"Deep screen skipped, could not read later pages of {filename}: {error}")
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self):
+        return (f"Deep screen: {self.papers} undecided papers, {self.changed} gained flags, "
+                f"{self.calls} chunk requests ({self.skipped_chunks} chunks skipped by early stop)"
+                + (f", {self.unreadable} papers skipped with unreadable later pages." if self.unreadable else "."))
@@ -0,0 +1,210 @@
+"""
+Accuracy-vs-throughput evaluation against gold labels.
+
+Screening is replayed for every configuration of a grid (model, temperature,
+pdf_char_limit, response format, ...) through ReplayEngine, an AIEngine that
+answers from a response cache keyed by the exact request (model, temperature,
+messages). With recording on, cache misses are sent to the real providers
+once and stored with their latency and token usage; afterwards the whole grid
+replays offline and deterministically.
+
+Each configuration is scored on precision/recall of the include decision,
+per-criterion agreement (when the gold file has criterion columns), papers
+per minute from the recorded API latencies (sleep_seconds excluded) and
+tokens per paper. pareto_front() keeps the configurations no other one beats
+on accuracy, speed and token cost at once.
+"""
+import os
+import json
+import hashlib
+import itertools
+from src.ai_engine import AIEngine, AIRequestError
+from src.providers import Completion
+
+# Grid keys that change the first-pass screening of a paper (dotted = nested setting)
+GRID_KEYS = ("model_id", "temperature", "pdf_char_limit", "response_format", "insights_words",
+             "local_metadata", "decision_policy", "cascade.enabled", "cascade.screen_model",
+             "cascade.confidence_threshold")
+GOLD_DECISION_COLS = ("Gold", "Included", "Included/Excluded")
+
+
+# --- RESPONSE CACHE ---
+
+def request_key(model, temperature, messages, json_mode=True):
+    payload = json.dumps([model, float(temperature or 0), bool(json_mode), messages], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Append-only JSONL of recorded completions, loaded into memory."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, model, completion):
+        entry = {"key": key, "model": model, "content": completion.content, "usage": completion.usage,
+                 "latency": round(completion.latency, 3), "provider": completion.provider}
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.entries[key] = entry
+        return entry
+
+
+class ReplayEngine(AIEngine):
+    """
+    AIEngine that answers from a ResponseCache. Misses go to `live` (an
+    AIEngine) and are recorded when it is given, otherwise they fail like an
+    exhausted request. Tracks API seconds, tokens and misses for the metrics.
+    """
+
+    def __init__(self, settings, cache, live=None):
+        from src.providers import Provider
+        self.cache = cache
+        self.live = live
+        # complete() never reaches the router: live's providers (or a stand-in) and no hedging
+        providers = live.router.providers if live else [Provider("replay", ["replay"])]
+        super().__init__({**settings, "hedging": {"enabled": False}, "max_capacity_wait": 0},
+                         providers=providers)
+        self.reset()
+
+    def reset(self):
+        self.seconds = 0.0
+        self.tokens = 0
+        self.calls = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def complete(self, messages, model, temperature, json_mode=True, parse=None, label=""):
+        key = request_key(model, temperature, messages, json_mode)
+        entry = self.cache.get(key)
+        if entry is not None:
+            try:
+                content = parse(entry["content"]) if parse else entry["content"]
+            except ValueError as e:
+                if self.live is None:
+                    raise AIRequestError(f"Unparseable recorded response: {e}")
+                entry = None  # Recorded before answers were validated: record it again
+
+        if entry is None:
+            if self.live is None:
+                self.misses += 1
+                raise AIRequestError("Not in response cache (record it with --record)")
+            # Parsed (and retried) like a real run; only a valid answer is recorded
+            content, completion = self.live.complete(messages, model, temperature, json_mode,
+                                                     parse=parse, label=label)
+            entry = self.cache.put(key, model, completion)
+            self.recorded += 1
+
+        usage = entry.get("usage") or {}
+        self.calls += 1
+        self.seconds += entry.get("latency") or 0.0
+        self.tokens += usage.get("total_tokens") or (usage.get("prompt_tokens", 0)
+                                                     + usage.get("completion_tokens", 0))
+        return content, Completion(entry["content"], usage, "replay", 0, entry.get("latency") or 0.0)
+
+
+# --- GRID ---
+
+def expand_grid(grid):
+    """{"model_id": [a, b], "temperature": [0]} -> [{"model_id": a, ...}, ...]"""
+    grid = grid or {}
+    unknown = [k for k in grid if k not in GRID_KEYS]
+    if unknown:
+        raise ValueError(f"Unsupported grid key(s): {', '.join(unknown)} (supported: {', '.join(GRID_KEYS)})")
+    keys = list(grid)
+    values = [v if isinstance(v, list) else [v] for v in grid.values()]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)] or [{}]
+
+
+def apply_config(settings, config):
+    """Copy of settings with the grid values applied (dotted keys set nested values)."""
+    merged = json.loads(json.dumps(settings))
+    for key, value in config.items():
+        target = merged
+        *parents, leaf = key.split(".")
+        for part in parents:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        target[leaf] = value
+    return merged
+
+
+def config_label(config):
+    return ", ".join(f"{k.split('.')[-1]}={v}" for k, v in config.items()) or "current settings"
+
+
+# --- GOLD LABELS & METRICS ---
+
+def load_gold(path, registry):
+    """
+    Gold CSV: 'File Name', a 0/1 decision column (Gold, Included or
+    Included/Excluded) and optionally one 0/1 column per criterion, named by
+    ID (INC_1) or by its wording. Returns (DataFrame with 'Gold', criterion IDs).
+    """
+    import pandas as pd
+    df = pd.read_csv(path)
+    if "File Name" not in df.columns:
+        raise ValueError(f"{path} has no 'File Name' column")
+    decision = next((c for c in GOLD_DECISION_COLS if c in df.columns), None)
+    if decision is None:
+        raise ValueError(f"{path} needs a decision column: one of {', '.join(GOLD_DECISION_COLS)}")
+    df = df.rename(columns={decision: "Gold"})
+    df = df.rename(columns={c["text"]: c["id"] for c in registry["criteria"]
+                            if c["text"] in df.columns and c["id"] not in df.columns})
+    df["Gold"] = pd.to_numeric(df["Gold"], errors="coerce")
+    df = df[df["Gold"].isin([0, 1])].reset_index(drop=True)
+    criteria = [c["id"] for c in registry["criteria"] if c["id"] in df.columns]
+    return df, criteria
+
+
+def classification(gold, predicted):
+    """Precision, recall, F1, false positive rate and false negative rate for 0/1 lists."""
+    tp = sum(1 for g, p in zip(gold, predicted) if g == 1 and p == 1)
+    fp = sum(1 for g, p in zip(gold, predicted) if g == 0 and p == 1)
+    fn = sum(1 for g, p in zip(gold, predicted) if g == 1 and p != 1)
+    tn = sum(1 for g, p in zip(gold, predicted) if g == 0 and p != 1)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "fp_rate": fp / (fp + tn) if fp + tn else 0.0,
+        "fn_rate": fn / (fn + tp) if fn + tp else 0.0,
+    }
+
+
+def agreement(gold_df, rows, criteria):
+    """Per-criterion share of papers whose flag matches the gold flag."""
+    result = {}
+    for cid in criteria:
+        pairs = [(g, row.get(cid)) for g, row in zip(gold_df[cid], rows)
+                 if g == g and row is not None]  # Skip blank gold cells and unscreened papers
+        if pairs:
+            result[cid] = sum(1 for g, p in pairs if int(g) == (1 if p == 1 else 0)) / len(pairs)
+    return result
+
+
+def pareto_front(results, metric):
+    """Indices of results not dominated on (metric up, papers/min up, tokens/paper down)."""
+    def dominates(a, b):
+        better_or_equal = (a[metric] >= b[metric] and a["papers_per_min"] >= b["papers_per_min"]
+                           and a["tokens_per_paper"] <= b["tokens_per_paper"])
+        strictly = (a[metric] > b[metric] or a["papers_per_min"] > b["papers_per_min"]
+                    or a["tokens_per_paper"] < b["tokens_per_paper"])
+        return better_or_equal and strictly
+    return [i for i, r in enumerate(results) if not any(dominates(o, r) for o in results if o is not r)]
@@ -0,0 +1,186 @@
+"""
+Per-request deadlines and hedged requests.
+
+Every call runs in a worker thread and is abandoned once its wall-clock
+deadline passes, so one hung connection cannot stall the screening loop.
+With hedging on, a call still running after the observed latency percentile
+(per model) gets a duplicate on a different healthy key; whichever answers
+first wins and the other is abandoned. Blocking HTTP clients cannot be
+interrupted mid-request, so an abandoned call keeps its router slot until it
+returns and its tokens are still counted.
+
+A quota guard only allows a hedge while the tokens spent on duplicates stay
+below `max_extra_tokens` (a share of the tokens of the answers actually used).
+"""
+import time
+import logging
+import threading
+from functools import partial
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger("SLR_Logger")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when no attempt answered before the request deadline."""
+
+
+def _tokens(usage):
+    usage = usage or {}
+    return usage.get("total_tokens") or (usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0))
+
+
+class LatencyTracker:
+    """Rolling window of successful request latencies, per model."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def add(self, model, seconds):
+        with self.lock:
+            self.samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model, q, min_samples):
+        with self.lock:
+            values = sorted(self.samples.get(model, ()))
+        if len(values) < min_samples:
+            return None
+        return values[min(int(q * len(values)), len(values) - 1)]
+
+
+class QuotaGuard:
+    """Keeps duplicate (hedge) tokens below a share of the tokens actually used."""
+
+    def __init__(self, max_extra_share):
+        self.max_extra_share = max_extra_share
+        self.used_tokens = 0
+        self.extra_tokens = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def record(self, usage, extra):
+        with self.lock:
+            if extra:
+                self.extra_tokens += _tokens(usage)
+            else:
+                self.used_tokens += _tokens(usage)
+                self.requests += 1
+
+    def allows_hedge(self):
+        with self.lock:
+            if not self.requests:
+                return False
+            estimate = self.used_tokens / self.requests
+            return self.extra_tokens + estimate <= self.max_extra_share * self.used_tokens
+
+    @property
+    def extra_share(self):
+        return self.extra_tokens / self.used_tokens if self.used_tokens else 0.0
+
+
+class Hedger:
+    """Router front-end adding deadlines and (optionally) hedged duplicates."""
+
+    def __init__(self, router, settings):
+        cfg = settings.get("hedging") or {}
+        self.router = router
+        self.deadline = settings.get("request_timeout", 120)
+        self.enabled = cfg.get("enabled", False)
+        self.percentile = cfg.get("percentile", 0.95)
+        self.min_delay = cfg.get("min_delay", 2.0)
+        self.min_samples = cfg.get("min_samples", 10)
+        self.tracker = LatencyTracker(cfg.get("window", 200))
+        self.quota = QuotaGuard(cfg.get("max_extra_tokens", 0.1))
+
+        # Abandoned calls keep a worker until their socket times out, so leave headroom
+        self.pool = ThreadPoolExecutor(max_workers=4 * router.total_keys + 8, thread_name_prefix="llm")
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadlines_hit = 0
+
+    def hedge_delay(self, model):
+        if not self.enabled:
+            return None
+        threshold = self.tracker.percentile(model, self.percentile, self.min_samples)
+        return None if threshold is None else max(threshold, self.min_delay)
+
+    def _launch(self, provider, key_index, messages, model, temperature, json_mode):
+        future = self.pool.submit(self.router.run, provider, key_index, messages, model, temperature, json_mode)
+        future.slot = (provider.name, key_index)
+        return future
+
+    def complete(self, messages, model, temperature, json_mode=True):
+        """Same contract as Router.complete, bounded by the request deadline."""
+        start = time.time()
+        provider, key_index = self.router.acquire()
+        legs = [self._launch(provider, key_index, messages, model, temperature, json_mode)]
+        pending = set(legs)
+        error = None
+
+        delay = self.hedge_delay(model)
+        while pending:
+            remaining = self.deadline - (time.time() - start)
+            if remaining <= 0:
+                break
+            hedge_at = max(delay - (time.time() - start), 0) if delay is not None and len(legs) == 1 else None
+            done, pending = wait(pending, timeout=min(remaining, hedge_at) if hedge_at is not None
+                                 else remaining, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    completion = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                return self._finish(future, completion, legs, pending, model)
+
+            if not done and hedge_at is not None and len(legs) == 1:
+                self._hedge(legs, pending, messages, model, temperature, json_mode)
+                delay = None
+
+        if error is not None and not pending:
+            raise error
+        self.deadlines_hit += 1
+        for future in pending:
+            future.add_done_callback(partial(self._abandoned, model, True))
+        raise DeadlineExceeded(f"No answer within {self.deadline:.0f}s (request_timeout)")
+
+    def _hedge(self, legs, pending, messages, model, temperature, json_mode):
+        if not self.quota.allows_hedge():
+            return
+        try:
+            provider, key_index = self.router.acquire(exclude=[legs[0].slot], block=False)
+        except Exception:
+            return  # No other healthy key right now: keep waiting on the first one
+        self.hedged += 1
+        logger.debug(f"🪁 Hedging on {provider.name} key #{key_index + 1} after slow {legs[0].slot[0]} call")
+        future = self._launch(provider, key_index, messages, model, temperature, json_mode)
+        legs.append(future)
+        pending.add(future)
+
+    def _finish(self, winner, completion, legs, pending, model):
+        self.tracker.add(model, completion.latency)
+        self.quota.record(completion.usage, extra=False)
+        if winner is not legs[0]:
+            self.hedge_wins += 1
+        for future in pending:
+            future.cancel()  # Not started yet -> never sent; otherwise abandoned
+            future.add_done_callback(partial(self._abandoned, model, False))
+        return completion
+
+    def _abandoned(self, model, timed_out, future):
+        """Late answers still count: their latency feeds the percentile, their tokens the quota."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        completion = future.result()
+        self.tracker.add(model, completion.latency)
+        if not timed_out:
+            self.quota.record(completion.usage, extra=True)
+
+    def summary(self):
+        return (f"Hedging: {self.hedged} hedged requests ({self.hedge_wins} won by the duplicate), "
+                f"{self.deadlines_hit} deadlines hit, extra tokens {self.quota.extra_share:.1%} "
+                f"of {self.quota.used_tokens} used.")
@@ -27,4 +27,161 @@ def extract_metadata(filepath):
     if year_match:
         metadata["Year"] = year_match.group(1)
 
-    return metadata
\ No newline at end of file
+    return metadata
+
+# --- LOCAL BIBLIOGRAPHIC METADATA ---
+# Fields resolved here are not asked from the LLM (fewer output tokens per call).
+# Keys match the AI response keys so they can be merged into a response.
+
+DOI_RE = re.compile(r'\b(10\.\d{4,9}/[^\s"<>]+)', re.IGNORECASE)
+ISSN_RE = re.compile(r'\b(?:e-?|p-?|print |online )?ISSN[:\s]*(\d{4}-?\d{3}[\dX])', re.IGNORECASE)
+VENUE_RES = [
+    re.compile(r'((?:IEEE|ACM) Transactions on [A-Z][^\n,;(]{3,100})'),
+    re.compile(r'(Proceedings of (?:the )?[^\n;(]{5,120})'),
+    re.compile(r'((?:\d{4} )?(?:\d+(?:st|nd|rd|th) )?(?:IEEE |ACM )?International (?:Conference|Symposium|Workshop) on [^\n,;(]{3,100})'),
+    re.compile(r'((?:International |European |American |Indian |Chinese )?Journal of [A-Z][^\n,;(]{3,100})'),
+]
+CONFERENCE_RE = re.compile(r'\b(proceedings|conference|symposium|workshop|congress)\b', re.IGNORECASE)
+JOURNAL_RE = re.compile(r'\b(journal|transactions|letters|review|annals|sensors|agronomy|plants|remote sensing)\b', re.IGNORECASE)
+JUNK_TITLE_RE = re.compile(r'^(microsoft word|untitled|title|document\d*|slide \d+)\b|\.(docx?|pdf|tex|dvi|indd)$', re.IGNORECASE)
+NAME_RE = re.compile(r"^[A-Z][\w.'\-]*(?: [A-Z][\w.'\-]*){1,4}$")
+XMP_RE = {
+    "title": re.compile(r'<dc:title>.*?<rdf:li[^>]*>(.*?)</rdf:li>', re.DOTALL),
+    "creator": re.compile(r'<dc:creator>.*?<rdf:li[^>]*>(.*?)</rdf:li>', re.DOTALL),
+    "publisher": re.compile(r'<dc:publisher>.*?<rdf:li[^>]*>(.*?)</rdf:li>', re.DOTALL),
+    "venue": re.compile(r'prism:publicationName(?:>|=")([^<"]+)'),
+    "doi": re.compile(r'prism:doi(?:>|=")([^<"]+)'),
+    "issn": re.compile(r'prism:e?issn(?:>|=")([^<"]+)'),
+    "type": re.compile(r'prism:aggregationType(?:>|=")([^<"]+)'),
+}
+
+# Registrant prefix of the DOI -> publisher
+DOI_PUBLISHERS = {
+    "10.1109": "IEEE", "10.1016": "Elsevier", "10.1007": "Springer", "10.3390": "MDPI",
+    "10.1038": "Nature", "10.1002": "Wiley", "10.1111": "Wiley", "10.1080": "Taylor & Francis",
+    "10.1155": "Hindawi", "10.3389": "Frontiers", "10.1145": "ACM", "10.1371": "PLOS",
+    "10.1117": "SPIE", "10.1088": "IOP", "10.1049": "IET", "10.1186": "BioMed Central",
+    "10.1051": "EDP Sciences", "10.1094": "APS", "10.1017": "Cambridge University Press",
+    "10.1093": "Oxford University Press", "10.1177": "SAGE", "10.1142": "World Scientific",
+    "10.5281": "Zenodo", "10.48550": "arXiv", "10.1101": "bioRxiv",
+}
+
+
+def _clean(value):
+    value = re.sub(r'\s+', ' ', str(value or '')).strip(' .,;:')
+    return value if value and value.lower() not in ('unknown', 'none', 'null', 'n/a') else ''
+
+
+def _valid_title(title):
+    title = _clean(title)
+    if len(title) < 15 or len(title.split()) < 3 or JUNK_TITLE_RE.search(title):
+        return ''
+    return title[:300]
+
+
+def _first_author(author):
+    # "A. Smith; B. Jones", "A. Smith and B. Jones", "A. Smith, B. Jones"
+    first = _clean(re.split(r';| and |, (?=[A-Z][\w.\-]* [A-Z])', _clean(author))[0])
+    return first if NAME_RE.match(first) else ''
+
+
+def _font_title(page):
+    """Largest-font run of text on the first page (usually the title)."""
+    runs = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        size = round(abs(font_size * tm[3] * (cm[3] or 1)), 1)
+        if text.strip() and size > 0:
+            runs.append((size, text))
+
+    try:
+        page.extract_text(visitor_text=visitor)
+    except Exception:
+        return ''
+
+    # Walk sizes from largest down; skip logos/running heads that are too short to be a title
+    for size in sorted({s for s, _ in runs}, reverse=True)[:4]:
+        title = _valid_title(" ".join(t for s, t in runs if abs(s - size) < 0.5))
+        if title and len(title.split()) <= 40:
+            return title
+    return ''
+
+
+def extract_bibliographic(filepath, text=""):
+    """
+    Resolves bibliographic fields locally from the PDF /Info dictionary, XMP,
+    DOI/ISSN/venue patterns in the first-page text and the font layout.
+    Returns only the fields that were found, keyed like the AI response.
+    """
+    from pypdf import PdfReader
+
+    found = {}
+    info, xmp, first_page = {}, "", None
+    try:
+        reader = PdfReader(filepath)
+        if reader.is_encrypted:
+            reader.decrypt("")
+        info = {k: str(v) for k, v in (reader.metadata or {}).items()}
+        stream = reader.trailer["/Root"].get("/Metadata")
+        if stream is not None:
+            xmp = stream.get_object().get_data().decode("utf-8", errors="ignore")
+        if len(reader.pages) > 0:
+            first_page = reader.pages[0]
+    except Exception:
+        pass
+
+    def xmp_field(name):
+        match = XMP_RE[name].search(xmp)
+        return _clean(match.group(1)) if match else ''
+
+    # 1. DOI / ISSN
+    doi_sources = [xmp_field("doi"), info.get("/doi", ""), info.get("/Subject", ""), text]
+    for source in doi_sources:
+        match = DOI_RE.search(source or '')
+        if match:
+            found["DOI"] = match.group(1).rstrip('.,;)]}').lower()
+            break
+    issn = xmp_field("issn") or next((m.group(1) for m in [ISSN_RE.search(text or '')] if m), '')
+
+    # 2. Title: XMP, /Info, then font layout
+    title = (_valid_title(xmp_field("title")) or _valid_title(info.get("/Title"))
+             or (_font_title(first_page) if first_page is not None else ''))
+    if title:
+        found["Extracted_Title"] = title
+
+    # 3. Venue: XMP, Elsevier-style /Subject ("Venue, 178 (2020) 105760"), then text patterns
+    venue = xmp_field("venue")
+    if not venue:
+        match = re.match(r'^([A-Z][^,\d]{4,120}),\s*\d', info.get("/Subject", ""))
+        venue = _clean(match.group(1)) if match else ''
+    if not venue:
+        for pattern in VENUE_RES:
+            match = pattern.search(text or '')
+            if match:
+                venue = _clean(re.sub(r'\s+\d.*$', '', match.group(1)))
+                break
+    if venue:
+        found["Venue_Name"] = venue
+
+    # 4. Publisher: XMP, DOI prefix, venue prefix
+    publisher = xmp_field("publisher") or DOI_PUBLISHERS.get(found.get("DOI", "").split("/")[0], '')
+    if not publisher and venue.split(" ")[0] in ("IEEE", "ACM"):
+        publisher = venue.split(" ")[0]
+    if publisher:
+        found["Publisher"] = publisher
+
+    # 5. Publication type from XMP, the venue name or an ISSN
+    kind = xmp_field("type").lower()
+    if kind == "journal" or (venue and JOURNAL_RE.search(venue) and not CONFERENCE_RE.search(venue)):
+        found["Publication_Type"] = "Journal"
+    elif kind == "conference" or CONFERENCE_RE.search(venue):
+        found["Publication_Type"] = "Conference"
+    elif issn:
+        found["Publication_Type"] = "Journal"
+
+    # 6. First author
+    author = _first_author(xmp_field("creator")) or _first_author(info.get("/Author"))
+    if author:
+        found["First_Author_Name"] = author
+
+    return found
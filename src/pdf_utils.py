@@ -3,29 +3,60 @@ import logging
 
 logging.basicConfig(filename='pdf_errors.log', level=logging.ERROR)
 
-def extract_text_from_pdf(pdf_path, char_limit=3500):
+def read_pdf_text(pdf_path, char_limit=3500):
+    """Page 1 (plus page 2 if page 1 is short). Raises on corrupt files."""
     text = ""
-    try:
-        reader = PdfReader(pdf_path)
-        
-        # Handle Encrypted Files
-        if reader.is_encrypted:
-            try:
-                reader.decrypt("")
-            except:
-                logging.error(f"Encrypted PDF skipped: {pdf_path}")
-                return ""
-
-        # Extract Page 1
-        if len(reader.pages) > 0:
-            text += reader.pages[0].extract_text() or ""
-            
-            # If Page 1 is too short (e.g., Title Page only), grab Page 2
-            if len(text) < 500 and len(reader.pages) > 1:
-                text += "\n" + (reader.pages[1].extract_text() or "")
+    reader = PdfReader(pdf_path)
+
+    # Handle Encrypted Files
+    if reader.is_encrypted:
+        try:
+            reader.decrypt("")
+        except:
+            logging.error(f"Encrypted PDF skipped: {pdf_path}")
+            return ""
+
+    # Extract Page 1
+    if len(reader.pages) > 0:
+        text += reader.pages[0].extract_text() or ""
+
+        # If Page 1 is too short (e.g., Title Page only), grab Page 2
+        if len(text) < 500 and len(reader.pages) > 1:
+            text += "\n" + (reader.pages[1].extract_text() or "")
 
+    return text[:char_limit]
+
+def extract_text_from_pdf(pdf_path, char_limit=3500):
+    try:
+        return read_pdf_text(pdf_path, char_limit)
     except Exception as e:
         logging.error(f"Corrupt PDF {pdf_path}: {e}")
         return ""
 
-    return text[:char_limit]
\ No newline at end of file
+def read_pdf_rest(pdf_path, char_limit=3500, max_chars=40000):
+    """
+    Text the first pass (read_pdf_text) did not see: the rest of the document,
+    page by page, up to `max_chars`. Raises on corrupt files.
+    """
+    seen = len(read_pdf_text(pdf_path, char_limit))
+    reader = PdfReader(pdf_path)
+    if reader.is_encrypted:
+        try:
+            reader.decrypt("")
+        except:
+            return ""
+
+    # The first pass is a prefix of page 1 + "\n" + page 2 + ...
+    parts = []
+    position = 0
+    total = 0
+    for page in reader.pages:
+        text = page.extract_text() or ""
+        unseen = text[max(seen - position, 0):]
+        position += len(text) + 1
+        if unseen.strip():
+            parts.append(unseen[:max_chars - total])
+            total += len(parts[-1])
+            if total >= max_chars:
+                break
+    return "\n".join(parts)
@@ -0,0 +1,300 @@
+"""
+LLM provider backends and a capacity/latency-aware router.
+
+A provider is one endpoint (Groq, or any OpenAI-compatible server such as a
+local llama.cpp / vLLM instance) with its own keys, model mapping and weight.
+The router sends each request to the provider with the best live score and
+spills over to `overflow` providers (usually local hardware) when every
+regular provider is rate-limited.
+"""
+import os
+import json
+import time
+import logging
+import threading
+import urllib.error
+import urllib.request
+from collections import namedtuple
+
+logger = logging.getLogger("SLR_Logger")
+
+Completion = namedtuple("Completion", ["content", "usage", "provider", "key_index", "latency"])
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+DEFAULT_COOLDOWN = 60     # Seconds a key rests after a 429 without Retry-After
+LATENCY_ALPHA = 0.3       # EWMA smoothing for observed latency
+
+
+class RateLimited(Exception):
+    """Raised by a provider when the endpoint answers 429."""
+    def __init__(self, message="Rate limited", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class NoCapacity(Exception):
+    """Raised by the router when no provider can take a request right now."""
+    def __init__(self, wait_seconds):
+        super().__init__(f"No provider capacity for {wait_seconds:.0f}s")
+        self.wait_seconds = wait_seconds
+
+
+def _mask(key):
+    return "..." + key[-4:] if key else "no key"
+
+
+class Provider:
+    """Base class: key pool, cooldowns, in-flight tracking and latency stats."""
+    kind = "base"
+
+    def __init__(self, name, keys, models=None, weight=1.0, overflow=False,
+                 max_concurrency=None, timeout=120):
+        self.name = name
+        self.keys = keys or [None]
+        self.models = models or {}
+        self.weight = float(weight)
+        self.overflow = overflow
+        self.max_concurrency = max_concurrency or len(self.keys)
+        self.timeout = timeout
+
+        self.cooldown_until = [0.0] * len(self.keys)
+        self.inflight = 0
+        self.latency = None
+        self.next_key = 0
+
+    def model_for(self, model):
+        """Maps the logical model id from settings.yaml to this provider's name."""
+        return self.models.get(model, model)
+
+    def free_keys(self, now):
+        return [i for i, until in enumerate(self.cooldown_until) if until <= now]
+
+    def capacity(self, now):
+        """Fraction of this provider that can accept a new request (0 = none)."""
+        free = len(self.free_keys(now))
+        if free == 0 or self.inflight >= self.max_concurrency:
+            return 0.0
+        return min(free / len(self.keys), 1 - self.inflight / self.max_concurrency)
+
+    def score(self, now):
+        # Unknown latency is treated optimistically so new providers get traffic
+        latency = self.latency if self.latency is not None else 1.0
+        return self.weight * self.capacity(now) / max(latency, 0.05)
+
+    def take_key(self, now, exclude=()):
+        """Round-robins over keys that are not cooling down (skipping `exclude`)."""
+        free = [i for i in self.free_keys(now) if i not in exclude]
+        for offset in range(len(self.keys)):
+            idx = (self.next_key + offset) % len(self.keys)
+            if idx in free:
+                self.next_key = (idx + 1) % len(self.keys)
+                return idx
+        return None
+
+    def observe(self, seconds):
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * self.latency
+
+    def cool_down(self, key_index, retry_after=None):
+        rest = float(retry_after) if retry_after else DEFAULT_COOLDOWN
+        self.cooldown_until[key_index] = time.time() + rest
+        logger.warning(f"⚠️ Rate Limit Hit! {self.name} key #{key_index + 1} "
+                       f"({_mask(self.keys[key_index])}) resting {rest:.0f}s")
+
+    def complete(self, key_index, messages, model, temperature, json_mode):
+        """Returns (content, usage dict). Raises RateLimited on 429."""
+        raise NotImplementedError
+
+
+class GroqProvider(Provider):
+    """Groq through its official SDK (one client per key)."""
+    kind = "groq"
+
+    def __init__(self, name, keys, base_url=GROQ_BASE_URL, **kwargs):
+        super().__init__(name, keys, **kwargs)
+        self.base_url = base_url.rstrip("/")  # OpenAI-compatible REST root (used for batch jobs)
+        self.clients = {}
+
+    def _client(self, key_index):
+        if key_index not in self.clients:
+            from groq import Groq
+            self.clients[key_index] = Groq(api_key=self.keys[key_index], timeout=self.timeout)
+        return self.clients[key_index]
+
+    def complete(self, key_index, messages, model, temperature, json_mode):
+        from groq import RateLimitError
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        try:
+            completion = self._client(key_index).chat.completions.create(
+                model=self.model_for(model),
+                messages=messages,
+                temperature=temperature,
+                **kwargs
+            )
+        except RateLimitError as e:
+            headers = getattr(getattr(e, "response", None), "headers", {}) or {}
+            raise RateLimited(str(e), headers.get("retry-after"))
+
+        usage = completion.usage.model_dump() if getattr(completion, "usage", None) else {}
+        return completion.choices[0].message.content, usage
+
+
+class OpenAICompatibleProvider(Provider):
+    """Any server exposing POST {base_url}/chat/completions (llama.cpp, vLLM, Ollama, ...)."""
+    kind = "openai"
+
+    def __init__(self, name, keys, base_url, **kwargs):
+        super().__init__(name, keys, **kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    def complete(self, key_index, messages, model, temperature, json_mode):
+        body = {"model": self.model_for(model), "messages": messages, "temperature": temperature}
+        if json_mode:
+            body["response_format"] = {"type": "json_object"}
+
+        headers = {"Content-Type": "application/json"}
+        key = self.keys[key_index]
+        if key:
+            headers["Authorization"] = f"Bearer {key}"
+
+        req = urllib.request.Request(f"{self.base_url}/chat/completions",
+                                     data=json.dumps(body).encode("utf-8"),
+                                     headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                data = json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                raise RateLimited(f"HTTP 429 from {self.name}", e.headers.get("Retry-After"))
+            raise RuntimeError(f"HTTP {e.code} from {self.name}: {e.read()[:200]!r}")
+
+        return data["choices"][0]["message"]["content"], data.get("usage") or {}
+
+
+PROVIDER_TYPES = {
+    "groq": GroqProvider,
+    "openai": OpenAICompatibleProvider,
+}
+
+
+def _keys_from_env(var):
+    raw = os.getenv(var) if var else None
+    return [k.strip() for k in raw.split(',') if k.strip()] if raw else []
+
+
+def build_providers(configs, default_timeout=120):
+    """
+    Builds providers from the `providers:` list in settings.yaml. Without one,
+    falls back to a single Groq provider using GROQ_API_KEYS (the old behaviour).
+    """
+    if not configs:
+        configs = [{"name": "groq", "type": "groq", "api_key_env": "GROQ_API_KEYS"}]
+
+    providers = []
+    for cfg in configs:
+        kind = cfg.get("type", "openai")
+        if kind not in PROVIDER_TYPES:
+            raise ValueError(f"Unknown provider type '{kind}' (use one of {', '.join(PROVIDER_TYPES)})")
+
+        keys = list(cfg.get("keys") or []) or _keys_from_env(cfg.get("api_key_env"))
+        if not keys and kind == "groq":
+            keys = _keys_from_env("GROQ_API_KEY")
+        if not keys and kind == "groq":
+            logger.warning(f"Provider '{cfg.get('name', kind)}' has no API keys; skipping.")
+            continue
+
+        kwargs = {
+            "models": cfg.get("models"),
+            "weight": cfg.get("weight", 1.0),
+            "overflow": cfg.get("overflow", False),
+            "max_concurrency": cfg.get("max_concurrency"),
+            "timeout": cfg.get("timeout", default_timeout),
+        }
+        if kind == "openai" or cfg.get("base_url"):
+            kwargs["base_url"] = cfg["base_url"]
+        providers.append(PROVIDER_TYPES[kind](cfg.get("name", kind), keys, **kwargs))
+    return providers
+
+
+class Router:
+    """Picks a (provider, key) per request from live capacity, latency and weight."""
+
+    def __init__(self, providers):
+        if not providers:
+            raise ValueError("No LLM providers configured.")
+        self.providers = providers
+        self.lock = threading.Condition()  # release() wakes requests waiting for a free slot
+
+    @property
+    def total_keys(self):
+        return sum(len(p.keys) for p in self.providers)
+
+    def acquire(self, exclude=(), block=True):
+        """
+        Reserves the best (provider, key_index). Regular providers are preferred;
+        overflow providers only get traffic once every regular one is saturated.
+        `exclude` holds (provider name, key_index) pairs that must not be reused.
+        When keys are free but every provider is at max_concurrency, waits for a
+        release (with `block`); NoCapacity is only raised while keys cool down.
+        """
+        def skipped(p):
+            return [i for name, i in exclude if name == p.name]
+
+        with self.lock:
+            while True:
+                now = time.time()
+                free = [p for p in self.providers if set(p.free_keys(now)) - set(skipped(p))]
+                candidates = [p for p in free if p.capacity(now) > 0]
+                regular = [p for p in candidates if not p.overflow]
+                pool = regular or candidates
+                if pool:
+                    break
+                if not free or not block:
+                    raise NoCapacity(self.next_free_in(now))
+                self.lock.wait(timeout=1.0)  # Saturated, not rate-limited: wait for a slot
+
+            provider = max(pool, key=lambda p: p.score(now))
+            key_index = provider.take_key(now, skipped(provider))
+            provider.inflight += 1
+            return provider, key_index
+
+    def release(self, provider, key_index, latency=None, rate_limited=None):
+        with self.lock:
+            provider.inflight = max(provider.inflight - 1, 0)
+            if latency is not None:
+                provider.observe(latency)
+            if rate_limited is not None:
+                provider.cool_down(key_index, rate_limited.retry_after)
+            self.lock.notify_all()
+
+    def next_free_in(self, now=None):
+        now = now or time.time()
+        return max(min(min(p.cooldown_until) for p in self.providers) - now, 0.0)
+
+    def complete(self, messages, model, temperature, json_mode=True):
+        """One attempt on the best available backend. Raises RateLimited/NoCapacity/errors."""
+        provider, key_index = self.acquire()
+        return self.run(provider, key_index, messages, model, temperature, json_mode)
+
+    def run(self, provider, key_index, messages, model, temperature, json_mode=True):
+        """Sends one request on an acquired (provider, key) and releases it afterwards."""
+        start = time.time()
+        try:
+            content, usage = provider.complete(key_index, messages, model, temperature, json_mode)
+        except RateLimited as e:
+            self.release(provider, key_index, rate_limited=e)
+            raise
+        except Exception:
+            self.release(provider, key_index)
+            raise
+        latency = time.time() - start
+        self.release(provider, key_index, latency=latency)
+        return Completion(content, usage, provider.name, key_index, latency)
+
+    def describe(self):
+        return ", ".join(
+            f"{p.name}[{p.kind}, {len(p.keys)} key(s){', overflow' if p.overflow else ''}]"
+            for p in self.providers
+        )
@@ -0,0 +1,268 @@
+"""
+Sandboxed PDF parsing.
+
+pypdf runs in separate worker processes, each with an address-space limit
+(RLIMIT_AS, POSIX only) and a per-file wall-clock timeout. A worker that
+runs over time is killed and replaced, one that hits the memory limit or
+crashes is replaced, and the file is added to a quarantine list (JSON, with
+the reason) so later runs skip it instead of stalling on it again.
+
+Workers are spawned fresh (not forked) so their memory limit is not eaten
+up by the parent's pandas/pyarrow heap. The pypdf import happens inside the
+worker; importing this module stays cheap for the CLI.
+"""
+import os
+import json
+import time
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger("SLR_Logger")
+
+DEFAULT_QUARANTINE = "data/results/quarantine.json"
+
+# text: extracted text ("" if unreadable); local: bibliographic fields; error: quarantine reason or None
+ParsedPDF = namedtuple("ParsedPDF", ["text", "local", "error"])
+
+
+# --- QUARANTINE LIST ---
+
+def quarantine_path(settings):
+    return (settings.get("pdf_sandbox") or {}).get("quarantine_file", DEFAULT_QUARANTINE)
+
+
+def load_quarantine(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_quarantine(entries, path):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+# --- WORKER PROCESS ---
+
+def _vm_size():
+    """Current virtual memory size in bytes (Linux), or 0 if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _parse(job):
+    from src.pdf_utils import read_pdf_text, read_pdf_rest
+    from src.metadata import extract_bibliographic
+
+    path, char_limit, want_metadata, rest_chars = job
+    try:
+        if rest_chars:
+            return read_pdf_rest(path, char_limit, rest_chars), {}  # Deep screen: later pages only
+        text = read_pdf_text(path, char_limit)
+    except MemoryError:
+        raise
+    except Exception as e:
+        logging.error(f"Corrupt PDF {path}: {e}")
+        text = ""
+    local = extract_bibliographic(path, text) if want_metadata and len(text) >= 50 else {}
+    return text, local
+
+
+def _worker_main(conn, memory_mb):
+    # Import pypdf & co. before capping memory, so the cap only bounds parsing
+    import src.pdf_utils  # noqa: F401
+    import src.metadata  # noqa: F401
+    if memory_mb:
+        try:
+            import resource
+            limit = _vm_size() + memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass  # Not supported here (e.g. Windows): only the timeout applies
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        try:
+            text, local = _parse(job)
+            conn.send(("ok", text, local))
+        except MemoryError:
+            conn.send(("error", f"memory limit exceeded ({memory_mb} MB)", None))
+
+
+class _Worker:
+    def __init__(self, ctx, memory_mb):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, memory_mb), daemon=True)
+        self.process.start()
+        child.close()
+        self.path = None
+        self.started = None
+
+    def submit(self, job):
+        self.path = job[0]
+        self.started = time.time()
+        self.conn.send(job)
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.kill()
+
+
+# --- SANDBOX ---
+
+class PDFSandbox:
+    """Extracts text (+ local metadata) from PDFs in time/memory-limited workers."""
+
+    def __init__(self, settings):
+        cfg = settings.get("pdf_sandbox") or {}
+        self.enabled = cfg.get("enabled", True)
+        self.timeout = cfg.get("timeout", 60)
+        self.memory_mb = cfg.get("memory_mb", 1024)
+        self.n_workers = max(int(cfg.get("workers", 1)), 1)
+        self.char_limit = settings.get("pdf_char_limit", 3500)
+        self.want_metadata = settings.get("local_metadata", True)
+
+        self.quarantine_file = quarantine_path(settings)
+        self.quarantine = load_quarantine(self.quarantine_file)
+        self.workers = []
+        self.ctx = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+
+    def is_quarantined(self, filepath):
+        return os.path.basename(filepath) in self.quarantine
+
+    def _quarantine(self, filepath, reason, seconds):
+        logger.error(f"🚧 Quarantined {os.path.basename(filepath)}: {reason}")
+        self.quarantine[os.path.basename(filepath)] = {
+            "path": filepath, "reason": reason, "seconds": round(seconds, 1),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        save_quarantine(self.quarantine, self.quarantine_file)
+        return ParsedPDF("", {}, reason)
+
+    def _failed(self, filepath, reason, seconds, quarantine):
+        if quarantine:
+            return self._quarantine(filepath, reason, seconds)
+        return ParsedPDF("", {}, reason)  # The caller logs it
+
+    def _spawn(self):
+        if self.ctx is None:
+            import multiprocessing
+            self.ctx = multiprocessing.get_context("spawn")
+        return _Worker(self.ctx, self.memory_mb)
+
+    def extract(self, filepath, rest_chars=None):
+        """Parses one file. Returns a ParsedPDF (error is set if it is quarantined)."""
+        if self.is_quarantined(filepath):
+            return ParsedPDF("", {}, self.quarantine[os.path.basename(filepath)]["reason"])
+        for _, parsed in self.extract_all([filepath], rest_chars):
+            return parsed
+
+    def extract_all(self, paths, rest_chars=None):
+        """
+        Yields (path, ParsedPDF) as files finish, using up to `workers` processes.
+        With `rest_chars`, text is the part of the document after what the first
+        pass reads (up to that many characters) and no metadata is resolved; such
+        a file already has a first-pass result, so a failure is only returned (the
+        caller logs and skips it), not quarantined.
+        """
+        from multiprocessing.connection import wait
+
+        queue = [p for p in paths if not self.is_quarantined(p)]
+        quarantine = not rest_chars
+        if not self.enabled:
+            # In-process, as before the sandbox: no limits, failures read as unreadable
+            for path in queue:
+                try:
+                    text, local = _parse((path, self.char_limit, self.want_metadata, rest_chars))
+                except MemoryError:
+                    text, local = "", {}
+                yield path, ParsedPDF(text, local, None)
+            return
+
+        queue.reverse()
+        while len(self.workers) < min(self.n_workers, len(queue)):
+            self.workers.append(self._spawn())
+        busy = {}
+
+        while queue or busy:
+            for worker in self.workers:
+                if worker.path is None and queue:
+                    worker.submit((queue.pop(), self.char_limit, self.want_metadata, rest_chars))
+                    busy[worker.conn] = worker
+
+            now = time.time()
+            next_deadline = min(w.started + self.timeout for w in busy.values())
+            ready = wait(list(busy) + [w.process.sentinel for w in busy.values()],
+                         timeout=max(next_deadline - now, 0))
+
+            for worker in list(busy.values()):
+                path, elapsed = worker.path, time.time() - worker.started
+                # Poll rather than trust `ready`: a worker may have answered since wait()
+                if worker.conn in ready or worker.conn.poll():
+                    try:
+                        status, text, local = worker.conn.recv()
+                    except (EOFError, OSError):
+                        status, text = "error", f"worker crashed (exit code {worker.process.exitcode})"
+                    if status == "ok":
+                        result = ParsedPDF(text, local, None)
+                    else:
+                        result = self._failed(path, text, elapsed, quarantine)
+                        self._replace(worker)
+                elif worker.process.sentinel in ready:
+                    worker.process.join()
+                    result = self._failed(path, f"worker crashed (exit code {worker.process.exitcode})",
+                                          elapsed, quarantine)
+                    self._replace(worker)
+                elif elapsed >= self.timeout:
+                    result = self._failed(path, f"timed out after {self.timeout}s", elapsed, quarantine)
+                    self._replace(worker)
+                else:
+                    continue
+
+                busy.pop(worker.conn, None)
+                worker.path = None
+                # The consumer may screen this file (API call + pause) before asking for the next:
+                # that time is not the other workers' parsing time, so their clocks stop meanwhile
+                suspended = time.time()
+                yield path, result
+                for other in busy.values():
+                    other.started += time.time() - suspended
+
+    def _replace(self, worker):
+        """Kills a worker (it may be stuck or over its memory cap) and starts a fresh one."""
+        worker.kill()
+        self.workers[self.workers.index(worker)] = self._spawn()
@@ -0,0 +1,134 @@
+"""
+Priority scheduling of pending papers.
+
+Every pending PDF gets a cheap local score before any API call, from:
+  * terms:  how much of each inclusion criterion's vocabulary appears in the
+            extracted text (mean coverage over the criteria),
+  * year:   the Year from the file name (newer first, unknown = middle),
+  * folder: the smoothed inclusion rate of its Category/Database folder in
+            the results screened so far (folders without history get the
+            overall rate).
+Papers are dispatched from a heap, highest score first, so probable
+inclusions are screened early in a throttled run. The expected number of
+inclusions (overall rate x pending) marks the "likely inclusions" at the top
+of the queue, and eta() projects when the last of them will be done.
+"""
+import re
+import heapq
+import itertools
+from src.metadata import extract_metadata
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9\-]+")
+STOPWORDS = {
+    "the", "and", "for", "with", "using", "use", "used", "either", "both", "any", "over", "than",
+    "that", "this", "from", "into", "not", "without", "other", "based", "focus", "focusing",
+    "paper", "papers", "study", "studies", "works", "articles", "research", "showing",
+    "recent", "real-world", "experimental", "traditional", "methods", "techniques",
+}
+DEFAULT_WEIGHTS = {"terms": 0.6, "folder": 0.3, "year": 0.1}
+DEFAULT_RATE = 0.2       # Assumed inclusion rate before anything has been screened
+FOLDER_PRIOR = 10        # Pseudo-papers at the overall rate added to every folder
+RATE_ALPHA = 0.2         # EWMA smoothing for seconds per paper
+
+
+def _stem(word):
+    return word[:-1] if len(word) > 4 and word.endswith("s") else word
+
+
+def criteria_terms(criteria):
+    """One set of content words per criterion ('AI/ML/DL' -> ai, ml, dl)."""
+    terms = []
+    for text in criteria:
+        words = WORD_RE.findall(text.replace("/", " "))
+        terms.append({_stem(w.lower()) for w in words
+                      if (w.isupper() and len(w) > 1) or (len(w) > 3 and w.lower() not in STOPWORDS)})
+    return [t for t in terms if t]
+
+
+def term_score(text, terms):
+    """Mean share of each criterion's terms found in the text (0..1)."""
+    if not terms or not text:
+        return 0.0
+    words = {_stem(w) for w in WORD_RE.findall(text.lower())}
+    return sum(len(t & words) / len(t) for t in terms) / len(terms)
+
+
+def folder_rates(results):
+    """Smoothed inclusion rate per (Category, Database) and the overall rate."""
+    counts = {}
+    total = included = 0
+    for row in results:
+        decision = row.get("Included/Excluded")
+        if str(decision) not in ("0", "1", "0.0", "1.0"):
+            continue  # Errors / not screened
+        key = (str(row.get("Category")), str(row.get("Database")))
+        n, k = counts.get(key, (0, 0))
+        hit = int(float(decision) == 1)
+        counts[key] = (n + 1, k + hit)
+        total += 1
+        included += hit
+    overall = (included + DEFAULT_RATE * FOLDER_PRIOR) / (total + FOLDER_PRIOR)
+    rates = {key: (k + overall * FOLDER_PRIOR) / (n + FOLDER_PRIOR) for key, (n, k) in counts.items()}
+    return rates, overall
+
+
+def _year(meta):
+    try:
+        return int(meta["Year"])
+    except (TypeError, ValueError):
+        return None
+
+
+class Scheduler:
+    """Max-priority queue of (path, parsed PDF) with an ETA for likely inclusions."""
+
+    def __init__(self, settings, inclusion, results):
+        cfg = settings.get("scheduler") or {}
+        self.weights = {**DEFAULT_WEIGHTS, **(cfg.get("weights") or {})}
+        self.terms = criteria_terms(inclusion)
+        self.rates, self.overall = folder_rates(results)
+        self.seconds_per_paper = cfg.get("seconds_per_paper") or settings.get("sleep_seconds", 20) + 5
+        self.items = []          # (path, parsed, meta, term score) until build()
+        self.heap = []
+        self.counter = itertools.count()
+        self.likely = 0          # Papers at the top of the queue expected to be inclusions
+        self.dispatched = 0
+
+    def add(self, path, parsed):
+        meta = extract_metadata(path)
+        self.items.append((path, parsed, meta, term_score(parsed.text, self.terms)))
+
+    def build(self):
+        """Scores everything added (year is relative to the pending papers) and heapifies."""
+        years = [y for y in (_year(m) for _, _, m, _ in self.items) if y is not None]
+        low, high = (min(years), max(years)) if years else (0, 0)
+        top_rate = max(list(self.rates.values()) + [self.overall])
+
+        for path, parsed, meta, terms in self.items:
+            year = _year(meta)
+            year_score = 0.5 if year is None or high == low else (year - low) / (high - low)
+            rate = self.rates.get((meta["Category"], meta["Database"]), self.overall)
+            score = (self.weights["terms"] * terms + self.weights["year"] * year_score
+                     + self.weights["folder"] * rate / top_rate)
+            self.heap.append((-score, next(self.counter), path, parsed))
+        heapq.heapify(self.heap)
+        self.items = []
+        self.likely = round(self.overall * len(self.heap))
+        return len(self.heap)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __iter__(self):
+        while self.heap:
+            _, _, path, parsed = heapq.heappop(self.heap)
+            self.dispatched += 1
+            yield path, parsed
+
+    def record(self, seconds):
+        """Feeds the observed time per paper (API call + pause) into the ETA."""
+        self.seconds_per_paper += RATE_ALPHA * (seconds - self.seconds_per_paper)
+
+    def eta(self):
+        """Seconds until the last likely inclusion has been screened (0 when past them)."""
+        return max(self.likely - self.dispatched, 0) * self.seconds_per_paper
@@ -0,0 +1,112 @@
+"""
+Shared helpers that turn an AI response into a result row.
+
+Criteria flags are written under stable criterion IDs (see src/criteria.py)
+and stamped with the wording they were answered for.
+"""
+import json
+from src.criteria import (HASHES_COL, load_registry, save_registry, sync_registry,
+                          registry_path, read_hashes, active, migrate_columns)
+from src.store import read_columns, load_results, save_results
+from src.decision import decide_row
+from src.metadata import extract_bibliographic
+
+# AI response key -> result column
+METADATA_FIELDS = [
+    ("Review_Research_Type", "Review/Research Paper", "Research Paper"),
+    ("Publisher", "Publication", ""),
+    ("Publication_Type", "Journal/Conference Paper", "Unknown"),
+    ("Venue_Name", "Scopus/SCI/SCIE/specific conference paper", ""),
+    ("First_Author_Name", "First Author Name", ""),
+    ("First_Author_Country", "First Author’s Country Name", "Unknown"),
+    ("Study_Area_Country", "Study Area Country Name", "Unknown"),
+    ("Insights", "Insights", ""),
+    ("DOI", "DOI", ""),
+]
+
+
+def prepare_criteria(settings, inc_list, exc_list):
+    """Syncs the criteria registry with the config files. Returns (registry, diff)."""
+    path = registry_path(settings)
+    registry = load_registry(path)
+    diff = sync_registry(registry, inc_list, exc_list)
+    save_registry(registry, path)
+    return registry, diff
+
+
+def criteria_ids(registry):
+    """(inclusion IDs, exclusion IDs) of the active criteria, in file order."""
+    return ([c["id"] for c in active(registry, "inclusion")],
+            [c["id"] for c in active(registry, "exclusion")])
+
+
+def migrate_store(store, registry):
+    """Rewrites a store that still uses criterion-text columns to use IDs (once)."""
+    texts = {c["text"] for c in registry["criteria"]}
+    if not texts.intersection(read_columns(store)):
+        return False
+    inc_ids, exc_ids = criteria_ids(registry)
+    save_results(migrate_columns(load_results(store), registry), store, inc_ids, exc_ids)
+    return True
+
+
+def apply_flags(meta, response, inc_criteria, exc_criteria):
+    """
+    Writes a strict 0/1 per criterion into `meta` (positional Inc_n/Exc_n in the
+    response map onto the given criteria) and stamps their hashes.
+    Returns (inc_score, exc_score) for the criteria that were asked.
+    """
+    hashes = read_hashes(meta.get(HASHES_COL))
+    scores = []
+    for key, prefix, criteria in (("Inclusion_Breakdown", "Inc", inc_criteria),
+                                  ("Exclusion_Breakdown", "Exc", exc_criteria)):
+        data = response.get(key) or {}
+        score = 0
+        for idx, c in enumerate(criteria):
+            val = 1 if data.get(f"{prefix}_{idx+1}", 0) == 1 else 0
+            meta[c["id"]] = val
+            hashes[c["id"]] = c["hash"]
+            score += val
+        scores.append(score)
+
+    meta[HASHES_COL] = json.dumps(hashes)
+    return scores[0], scores[1]
+
+
+def clear_flags(meta, criteria):
+    """Marks every criterion as 0 (e.g. unreadable PDFs) for the current wording."""
+    hashes = read_hashes(meta.get(HASHES_COL))
+    for c in criteria:
+        meta[c["id"]] = 0
+        hashes[c["id"]] = c["hash"]
+    meta[HASHES_COL] = json.dumps(hashes)
+
+
+def apply_metadata(meta, response):
+    for key, col, default in METADATA_FIELDS:
+        meta[col] = response.get(key, default)
+
+
+def local_metadata(settings, filepath, text):
+    """Bibliographic fields resolved without the LLM ({} when disabled)."""
+    if not settings.get("local_metadata", True):
+        return {}
+    return extract_bibliographic(filepath, text)
+
+
+def apply_response(meta, response, inc_criteria, exc_criteria, policy, local=None):
+    """
+    Fills a result row from one AI response: title, criteria flags, the rule
+    engine's decision and metadata. Fields in `local` (resolved from the PDF
+    itself) take precedence over the model's. Returns (inc_score, exc_score).
+    """
+    if local:
+        response = {**response, **local}
+    extracted_title = str(response.get("Extracted_Title", "") or "").strip()
+    meta["Research Paper Title"] = extracted_title if len(extracted_title) > 5 else meta["File Name"]
+
+    inc_score, exc_score = apply_flags(meta, response, inc_criteria, exc_criteria)
+    meta["Included/Excluded"] = decide_row(meta, policy, [c["id"] for c in inc_criteria],
+                                           [c["id"] for c in exc_criteria])
+    apply_metadata(meta, response)
+    return inc_score, exc_score
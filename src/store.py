@@ -0,0 +1,225 @@
+"""
+Columnar results store.
+
+Screening results are kept in Parquet (or CSV when pyarrow is unavailable) so
+audit scripts can read just the columns they need. The Excel workbook is only
+produced on export, streamed row batch by row batch in constant memory.
+
+pandas/pyarrow/openpyxl are imported inside functions so importing this
+module stays cheap for the CLI.
+"""
+import os
+
+BASE_COLS = ['Category', 'Database', 'Year', 'Research Paper Title', 'Included/Excluded']
+META_COLS = [
+    'Review/Research Paper', 'Publication', 'Journal/Conference Paper',
+    'Scopus/SCI/SCIE/specific conference paper', 'First Author Name',
+    'First Author’s Country Name', 'Study Area Country Name', 'Insights', 'DOI', 'File Name'
+]
+
+DEFAULT_STORE = "data/results/slr_screened.parquet"
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+
+
+def has_parquet():
+    import importlib.util
+    return importlib.util.find_spec("pyarrow") is not None  # Without importing it
+
+
+def store_path(settings):
+    """Resolves the results store, falling back to CSV if pyarrow is missing."""
+    path = settings.get("results_store", DEFAULT_STORE)
+    if path.endswith(".parquet") and not has_parquet():
+        path = path[:-len(".parquet")] + ".csv"
+    return path
+
+
+def column_order(columns, inc_list, exc_list, keep_extra=True):
+    """
+    Same ordering as the original save_excel: base, criteria, then metadata.
+    The store keeps extra columns (e.g. Filepath) at the end; exports drop them.
+    """
+    ordered = [c for c in BASE_COLS + list(inc_list) + list(exc_list) + META_COLS if c in columns]
+    if not keep_extra:
+        return ordered
+    return ordered + [c for c in columns if c not in ordered]
+
+
+def read_columns(path):
+    """Column names of the store without reading any rows."""
+    if not os.path.exists(path):
+        return []
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    import csv
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+
+def _rows_path(path):
+    return path + ".rows"
+
+
+def count_rows(path):
+    """
+    Row count from the sidecar written by save_results, so 'slr.py status'
+    never imports pyarrow. A missing or outdated sidecar (store written by
+    something else) falls back to the Parquet footer or a CSV line scan.
+    """
+    if not os.path.exists(path):
+        return 0
+    sidecar = _rows_path(path)
+    if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path):
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            pass
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    import csv
+    with open(path, newline='', encoding='utf-8') as f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+def load_results(path, columns=None):
+    """
+    Loads the store as a DataFrame. With `columns`, only those columns are read
+    (columns that do not exist in the store are ignored).
+    """
+    import pandas as pd
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns or [])
+
+    if columns is not None:
+        available = set(read_columns(path))
+        columns = [c for c in columns if c in available]
+
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_batches(path, columns=None, batch_size=1000, as_text=False):
+    """
+    Yields the store as DataFrames of at most `batch_size` rows. CSV chunks infer
+    their dtypes independently, so `as_text` reads them as strings when a stable
+    schema across chunks matters more than numeric types.
+    """
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        dtype = str if as_text else None
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=batch_size, dtype=dtype):
+            yield chunk
+
+
+def _normalise(df):
+    """Parquet needs one type per column: numeric where possible, else text."""
+    import pandas as pd
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        numeric = pd.to_numeric(df[col], errors='coerce')
+        if numeric.notna().sum() == df[col].notna().sum():
+            df[col] = numeric
+        else:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def save_results(results, path, inc_list, exc_list):
+    """Writes all rows to the store atomically (temp file + rename)."""
+    import pandas as pd
+    df = results if isinstance(results, pd.DataFrame) else pd.DataFrame(results)
+    df = _normalise(df[column_order(list(df.columns), inc_list, exc_list)].copy())
+
+    tmp_path = path + ".tmp"
+    if path.endswith(".parquet"):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    with open(_rows_path(path), 'w', encoding='utf-8') as f:
+        f.write(str(len(df)))
+    return len(df)
+
+
+def migrate_legacy_excel(excel_path, path, inc_list, exc_list):
+    """One-off import of an existing .xlsx results file into the store."""
+    if os.path.exists(path) or not excel_path or not os.path.exists(excel_path):
+        return False
+    import pandas as pd
+    save_results(pd.read_excel(excel_path), path, inc_list, exc_list)
+    return True
+
+
+def _cell(value):
+    # Write-only sheets reject NaN; blank cells are what Excel users expect
+    if value is None or value != value:
+        return None
+    return value
+
+
+def export_results(path, out_path, inc_list, exc_list, fmt=None, batch_size=1000, headers=None):
+    """
+    Exports the store to xlsx/csv/parquet, one batch at a time so memory stays
+    constant regardless of how many papers have been screened. `headers` renames
+    columns on the way out (criterion ID -> criterion wording).
+    """
+    fmt = (fmt or os.path.splitext(out_path)[1].lstrip(".")).lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt} (use one of {', '.join(EXPORT_FORMATS)})")
+
+    columns = column_order(read_columns(path), inc_list, exc_list, keep_extra=False)
+    headers = headers or {}
+    titles = [headers.get(c, c) for c in columns]
+    rows = 0
+    tmp_path = out_path + ".tmp"
+
+    if fmt == "xlsx":
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(titles)
+        for df in iter_batches(path, columns, batch_size):
+            for record in df[columns].itertuples(index=False, name=None):
+                ws.append([_cell(v) for v in record])
+            rows += len(df)
+        wb.save(tmp_path)
+
+    elif fmt == "csv":
+        header = True
+        for df in iter_batches(path, columns, batch_size):
+            df = df[columns].set_axis(titles, axis=1)
+            df.to_csv(tmp_path, mode='w' if header else 'a', header=header, index=False)
+            header = False
+            rows += len(df)
+        if header:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(",".join(titles) + "\n")
+
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        for df in iter_batches(path, columns, batch_size, as_text=not path.endswith(".parquet")):
+            df = df[columns].set_axis(titles, axis=1)
+            schema = writer.schema if writer is not None else None
+            table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema)
+            writer.write_table(table)
+            rows += len(df)
+        if writer is not None:
+            writer.close()
+        else:
+            pq.write_table(pa.table({c: [] for c in titles}), tmp_path)
+
+    os.replace(tmp_path, out_path)
+    return rows
@@ -1,7 +1,11 @@
 import os
+import re
+import json
 import yaml
 
-def load_settings(config_path="config/settings.yaml"):
+DEFAULT_CONFIG = "config/settings.yaml"
+
+def load_settings(config_path=DEFAULT_CONFIG):
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Missing config file: {config_path}")
     
@@ -25,8 +29,36 @@ def load_criteria(config_folder="config"):
 
     return inclusion, exclusion
 
+def config_folder(config_path=DEFAULT_CONFIG):
+    """Criteria files (inclusion.txt / exclusion.txt) live next to settings.yaml."""
+    return os.path.dirname(config_path) or "."
+
 def ensure_directories(settings):
     output_file = settings.get("output_file", "data/results/slr_screened.xlsx")
     output_dir = os.path.dirname(output_file)
     if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
\ No newline at end of file
+        os.makedirs(output_dir)
+
+def find_file_recursive(root_dir, target_filename):
+    """Recursively searches for a file in a directory tree."""
+    for dirpath, _, filenames in os.walk(root_dir):
+        if target_filename in filenames:
+            return os.path.join(dirpath, target_filename)
+    return None
+
+def locate_pdf(row, input_folder):
+    """PDF of a result row: its stored Filepath if it still exists, else found by File Name."""
+    path = row.get("Filepath")
+    if isinstance(path, str) and os.path.exists(path):
+        return path
+    return find_file_recursive(input_folder, row["File Name"])
+
+def extract_json_from_text(text):
+    """Surgical tool to find JSON inside a messy AI response."""
+    try:
+        match = re.search(r'(\{.*\})', text, re.DOTALL)
+        if match:
+            return json.loads(match.group(1))
+    except Exception:
+        pass
+    return None
@@ -0,0 +1,132 @@
+"""
+Polling folder watcher for watch mode.
+
+Creating, deleting or renaming a file changes its directory's mtime, so each
+poll only stats the known directories and lists the ones whose mtime moved.
+New or changed PDFs are handed out once their size and mtime have stayed the
+same for `settle_seconds` (a file still being copied keeps growing) and it
+ends with the %%EOF trailer; one that never gets a trailer (truncated) is
+handed out after INCOMPLETE_WAIT settle periods anyway. A file overwritten in
+place does not touch its directory, so every `rescan_seconds` all directories
+are listed again. Standard library only, no OS services.
+"""
+import os
+import time
+
+# Directory mtimes this close to "now" may still change within the same tick
+# (coarse filesystem timestamps), so such directories are listed again next poll.
+MTIME_SLACK = 2.0
+INCOMPLETE_WAIT = 10
+
+
+def _has_trailer(path):
+    """Cheap completeness check: a fully written PDF ends with %%EOF."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 1024, 0))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+def _signature(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime
+
+
+class FolderWatcher:
+    """Reports new/changed files under `root` once they stop changing."""
+
+    def __init__(self, root, settle_seconds=5, rescan_seconds=300, extensions=(".pdf",)):
+        self.root = root
+        self.settle_seconds = settle_seconds
+        self.rescan_seconds = rescan_seconds
+        self.extensions = extensions
+        self.dirs = {}      # directory -> mtime when it was last listed (None = list again)
+        self.files = {}     # path -> (size, mtime) when it was last handed out
+        self.pending = {}   # path -> ((size, mtime), first seen with that signature)
+        self.last_rescan = 0.0
+
+    def prime(self, done=lambda path: False):
+        """
+        Lists the whole tree. Files for which `done(path)` is true count as
+        already handed out (e.g. already screened); the rest start settling.
+        """
+        self.poll()
+        for path in list(self.pending):
+            if done(path):
+                self.files[path] = self.pending.pop(path)[0]
+
+    def poll(self, now=None):
+        """Returns the paths that are new/changed and settled, sorted."""
+        now = time.time() if now is None else now
+        rescan = now - self.last_rescan >= self.rescan_seconds
+        if rescan:
+            self.last_rescan = now
+        if self.root not in self.dirs and os.path.isdir(self.root):
+            self.dirs[self.root] = None
+
+        for directory, seen_mtime in list(self.dirs.items()):
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                self._forget(directory)
+                continue
+            if rescan or mtime != seen_mtime:
+                self.dirs[directory] = mtime if now - mtime > MTIME_SLACK else None
+                self._list(directory, now)
+
+        ready = []
+        for path, (signature, since) in list(self.pending.items()):
+            try:
+                current = _signature(path)
+            except OSError:
+                del self.pending[path]  # Deleted/renamed before it settled
+                continue
+            if current != signature:
+                self.pending[path] = (current, now)
+            elif now - since >= self.settle_seconds and (
+                    _has_trailer(path) or now - since >= self.settle_seconds * INCOMPLETE_WAIT):
+                del self.pending[path]
+                self.files[path] = current
+                ready.append(path)
+        return sorted(ready)
+
+    def _list(self, directory, now):
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            self._forget(directory)
+            return
+        present = set()
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.path not in self.dirs:
+                    self.dirs[entry.path] = None
+                    self._list(entry.path, now)
+                continue
+            if not entry.name.lower().endswith(self.extensions):
+                continue
+            present.add(entry.path)
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            signature = (st.st_size, st.st_mtime)
+            if self.files.get(entry.path) != signature and entry.path not in self.pending:
+                self.pending[entry.path] = (signature, now)
+
+        # Files removed from this directory are forgotten (a copy back counts as new)
+        for path in [p for p in self.files if os.path.dirname(p) == directory and p not in present]:
+            del self.files[path]
+
+    def _forget(self, directory):
+        prefix = directory + os.sep
+        for table in (self.dirs, self.files, self.pending):
+            for path in [p for p in table if p == directory or p.startswith(prefix)]:
+                del table[path]
+
+    @property
+    def settling(self):
+        return len(self.pending)
@@ -0,0 +1,117 @@
+"""
+Compact response wire format.
+
+Completion tokens are the slowest part of every call, so in compact mode the
+model answers with short keys and positional criteria bit strings:
+
+    {"t": "Title", "inc": "101", "exc": "00", "rt": "R", "pt": "J", ...}
+
+decode() expands that back into the full response shape (Extracted_Title,
+Inclusion_Breakdown {"Inc_1": 1, ...}, ...) so everything downstream (the
+cascade, apply_response, the result columns) is unchanged.
+"""
+
+# Full response key -> short code
+COMPACT_KEYS = {
+    "Extracted_Title": "t",
+    "Review_Research_Type": "rt",
+    "Publication_Type": "pt",
+    "Publisher": "pub",
+    "Venue_Name": "ven",
+    "First_Author_Name": "fa",
+    "First_Author_Country": "fac",
+    "Study_Area_Country": "sac",
+    "Insights": "ins",
+    "Confidence": "c",
+}
+FULL_KEYS = {code: key for key, code in COMPACT_KEYS.items()}
+
+VALUE_CODES = {
+    "rt": {"R": "Research Paper", "V": "Review Paper"},
+    "pt": {"J": "Journal", "C": "Conference", "B": "Book Chapter", "O": "Other"},
+}
+
+COMPACT_RULES = ('KEYS: inc/exc = one digit per criterion in list order (1 = Met); t = title; '
+                 'rt: R=research, V=review; pt: J=journal, C=conference, B=book chapter, O=other; '
+                 'pub = publisher; ven = venue; fa = first author; fac = first author country; '
+                 'sac = study area country; ins = insights.')
+
+
+def wire_options(settings):
+    """(compact, insights_words) from settings. insights_words=0 drops Insights."""
+    settings = settings or {}
+    return settings.get("response_format", "full") == "compact", settings.get("insights_words")
+
+
+def insights_hint(insights_words):
+    return f"Summary in at most {insights_words} words" if insights_words else "Summary"
+
+
+def compact_template(full_template, n_inc, n_exc):
+    """Converts the full JSON template into its compact equivalent."""
+    template = {}
+    if "Inclusion_Breakdown" in full_template:
+        template["inc"] = "0" * n_inc
+        template["exc"] = "0" * n_exc
+    for key, value in full_template.items():
+        code = COMPACT_KEYS.get(key)
+        if not code:
+            continue
+        codes = VALUE_CODES.get(code)
+        template[code] = next(iter(codes)) if codes else value
+    return template
+
+
+def _bits(value, count):
+    """'101' / 101 / [1, 0, 1] -> [1, 0, 1]. Missing or bad positions are None."""
+    if isinstance(value, list):
+        value = "".join(str(v) for v in value)
+    elif isinstance(value, int):
+        value = str(value).zfill(count)  # A bare number loses its leading zeros
+    value = "".join(str(value or "").split())
+    return [int(ch) if ch in "01" else None for ch in value[:count]] + [None] * (count - len(value))
+
+
+def decode(response, n_inc, n_exc):
+    """Expands a compact response into the full response shape."""
+    if not isinstance(response, dict) or "inc" not in response and "exc" not in response:
+        return response  # Already in the full format (or not JSON at all)
+
+    full = {}
+    for key, prefix, count in (("inc", "Inc", n_inc), ("exc", "Exc", n_exc)):
+        flags = _bits(response.get(key), count)
+        breakdown = "Inclusion_Breakdown" if key == "inc" else "Exclusion_Breakdown"
+        full[breakdown] = {f"{prefix}_{i+1}": v for i, v in enumerate(flags)}
+
+    for code, value in response.items():
+        key = FULL_KEYS.get(code)
+        if key:
+            full[key] = VALUE_CODES.get(code, {}).get(str(value).strip().upper(), value)
+    return full
+
+
+def check_flags(response):
+    """Raises ValueError if any flag could not be decoded (None), so the answer counts as failed."""
+    if isinstance(response, dict):
+        for key in ("Inclusion_Breakdown", "Exclusion_Breakdown"):
+            missing = [k for k, v in (response.get(key) or {}).items() if v is None]
+            if missing:
+                raise ValueError(f"Missing or invalid flags: {', '.join(missing)}")
+    return response
+
+
+def encode(response, n_inc, n_exc):
+    """Full response -> compact (used by benchmarks and cached replays)."""
+    compact = {}
+    for key, prefix, count in (("Inclusion_Breakdown", "Inc", n_inc), ("Exclusion_Breakdown", "Exc", n_exc)):
+        if key in response:
+            data = response.get(key) or {}
+            compact[key[:3].lower()] = "".join("1" if data.get(f"{prefix}_{i+1}") == 1 else "0"
+                                              for i in range(count))
+    for key, value in response.items():
+        code = COMPACT_KEYS.get(key)
+        if not code:
+            continue
+        reverse = {v: c for c, v in VALUE_CODES.get(code, {}).items()}
+        compact[code] = reverse.get(value, value)
+    return compact
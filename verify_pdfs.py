@@ -1,13 +1,13 @@
 import os
 from pypdf import PdfWriter, PdfReader
-from src.utils import load_settings
+from src.utils import load_settings, DEFAULT_CONFIG
 
-def main():
+def main(config=DEFAULT_CONFIG):
     print("--- Generating Verification PDF (First 10 Files) ---")
 
     # 1. Load Settings to find the correct folder
     try:
-        settings = load_settings()
+        settings = load_settings(config)
         input_folder = settings.get("input_folder", "data/raw_pdfs")
     except:
         # Fallback if config fails
@@ -0,0 +1,74 @@
+import time
+from main import Session, MIN_TEXT, logger
+from src.utils import DEFAULT_CONFIG
+from src.watcher import FolderWatcher
+
+
+def watch_settings(settings):
+    cfg = settings.get("watch") or {}
+    return {
+        "interval": cfg.get("interval", 2),
+        "settle_seconds": cfg.get("settle_seconds", 5),
+        "rescan_seconds": cfg.get("rescan_seconds", 300),
+        "export": cfg.get("export", True),
+    }
+
+
+def main(interval=None, max_cycles=None, config=DEFAULT_CONFIG):
+    """
+    Screens new/changed PDFs as they appear under input_folder, until Ctrl+C.
+    Settings, criteria, the AI engine, PDF workers and the results stay loaded
+    between polls, so a new paper only costs its own parse + API call.
+    """
+    logger.info("--- Auto-SLR-Screener Watch Mode ---")
+    try:
+        session = Session(config)
+    except Exception as e:
+        logger.critical(f"Startup Failed: {e}")
+        return
+
+    settings = session.settings
+    cfg = watch_settings(settings)
+    interval = interval or cfg["interval"]
+    input_folder = settings.get("input_folder", "data/raw_pdfs")
+    session.load_results()
+
+    # 1. Everything already screened (or quarantined) is the baseline; only changes count
+    watcher = FolderWatcher(input_folder, cfg["settle_seconds"], cfg["rescan_seconds"])
+    watcher.prime(done=lambda p: session.is_done(p) or session.sandbox.is_quarantined(p))
+    logger.info(f"👀 Watching {input_folder} every {interval}s ({len(watcher.dirs)} folders, "
+                f"{watcher.settling} PDFs pending).")
+
+    cycles = 0
+    try:
+        while max_cycles is None or cycles < max_cycles:
+            cycles += 1
+            # 2. Settled new/changed files (a changed file replaces its old row)
+            queue = [p for p in watcher.poll() if not session.sandbox.is_quarantined(p)]
+            if not queue:
+                time.sleep(interval)
+                continue
+
+            logger.info(f"📥 {len(queue)} new/changed PDFs")
+            screened = 0
+            for n, (filepath, parsed) in enumerate(session.sandbox.extract_all(queue)):
+                meta = session.screen(filepath, parsed)
+                if meta is None:
+                    continue
+                screened += 1
+                waiting = len(queue) - n - 1 + watcher.settling
+                logger.info(f"✔️ {meta['File Name']} -> {meta['Included/Excluded']} ({waiting} waiting)")
+                if len(parsed.text) >= MIN_TEXT and n + 1 < len(queue):
+                    session.pause()
+
+            # 3. Persist from memory (no re-read of the store) and refresh the export
+            if screened:
+                session.save()
+                if cfg["export"]:
+                    session.export()
+    except KeyboardInterrupt:
+        logger.info("🛑 Watch stopped.")
+    finally:
+        session.close()
+        if session.results:
+            session.save()